@@ -0,0 +1,14 @@
+"""Load Generator and Latency Benchmark Harness for the Echo Servers
+
+Each server of `examples.core` runs in its own subprocess on loopback, driven by
+closed-loop clients (one request in flight per connection) with configurable
+concurrency, message size and duration. Latencies are recorded in an HDR-style
+histogram, and results can be written as JSON to compare runs:
+
+    python -m examples.bench --servers asyncio_tcp_server io_multiplex_server \
+        --concurrency 32 --message-size 128 --duration 5 --json run.json
+    python -m examples.bench --baseline run.json
+
+With `--rate`, requests are sent open-loop at a fixed rate over `--concurrency`
+connections, and latencies measured from the intended send times (`open_loop`).
+"""
@@ -0,0 +1,132 @@
+"""Command Line: run the benchmark, print a table, and save/compare JSON results."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import time
+from typing import Any
+
+from examples.bench.load import run_load
+from examples.bench.open_loop import run_open_load
+from examples.bench.servers import SERVERS
+
+PORT = 18900  # the servers listen on consecutive ports from here
+
+
+def _row(result: dict[str, Any]) -> str:
+    latency = result['latency_us']
+    return (
+        f'{result["server"]:>24} {result["throughput"]:>12.0f} {latency["p50"]:>8} '
+        f'{latency["p99"]:>8} {latency["p99.9"]:>8} {result["errors"]:>7}'
+    )
+
+
+def _change(new: float, old: float) -> float:
+    return new / old - 1 if old else 0.0
+
+
+def _key(result: dict[str, Any]) -> tuple[object, ...]:
+    """Results of the same load (closed loop results of earlier runs have no `mode`)."""
+    return (
+        result['server'],
+        result.get('mode', 'closed'),
+        result.get('rate'),
+        result['concurrency'],
+        result['message_size'],
+    )
+
+
+def _compare(results: list[dict[str, Any]], baseline: list[dict[str, Any]]) -> None:
+    """Print the changes of throughput and p99 latency against the baseline."""
+    previous = {_key(result): result for result in baseline}
+    print(f'\n{"vs. baseline":>24} {"throughput":>12} {"p99":>8}')
+    for result in results:
+        base = previous.get(_key(result))
+        if base is None:
+            print(f'{result["server"]:>24} {"(no baseline)":>21}')
+            continue
+        throughput = _change(result['throughput'], base['throughput'])
+        p99 = _change(result['latency_us']['p99'], base['latency_us']['p99'])
+        print(f'{result["server"]:>24} {throughput:>+12.1%} {p99:>+8.1%}')
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m examples.bench',
+        description='Throughput and latency of the echo servers, on loopback.',
+    )
+    parser.add_argument('--servers', nargs='+', choices=list(SERVERS), metavar='SERVER')
+    parser.add_argument(
+        '--concurrency', type=int, default=32, help='clients (closed loop), or connections'
+    )
+    parser.add_argument(
+        '--rate', type=float, help='requests/sec: open loop at this rate (TCP, UDS servers)'
+    )
+    parser.add_argument('--message-size', type=int, default=128, help='bytes')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds, per server')
+    parser.add_argument('--warmup', type=float, default=1.0, help='seconds, not measured')
+    parser.add_argument('--port', type=int, default=PORT, help='first port')
+    parser.add_argument('--json', metavar='PATH', help='save the results')
+    parser.add_argument('--baseline', metavar='PATH', help='compare with saved results')
+    args = parser.parse_args(argv)
+    logging.disable(logging.INFO)  # client debug logs (per connection) of `examples.core`
+    if args.servers is None:
+        args.servers = [
+            name for name, spec in SERVERS.items() if args.rate is None or spec.transport != 'udp'
+        ]
+    elif args.rate is not None and any(SERVERS[name].transport == 'udp' for name in args.servers):
+        parser.error('--rate: open loop over TCP and UDS servers only')
+
+    print(
+        f'{"server":>24} {"requests/sec":>12} {"p50 us":>8} {"p99 us":>8} '
+        f'{"p99.9 us":>8} {"errors":>7}'
+    )
+    results: list[dict[str, Any]] = []
+    for i, name in enumerate(args.servers):
+        if args.rate is None:
+            result = run_load(
+                name,
+                port=args.port + i,
+                concurrency=args.concurrency,
+                message_size=args.message_size,
+                duration=args.duration,
+                warmup=args.warmup,
+            )
+        else:
+            result = run_open_load(
+                name,
+                port=args.port + i,
+                rate=args.rate,
+                connections=args.concurrency,
+                message_size=args.message_size,
+                duration=args.duration,
+                warmup=args.warmup,
+            )
+        print(_row(result), flush=True)
+        results.append(result)
+
+    if args.json:
+        run = {
+            'meta': {
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            },
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(run, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            _compare(results, json.load(f)['results'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""HDR-Style Latency Histogram
+
+Log-linear buckets (as HdrHistogram): values are grouped by power of 2, and each power
+of 2 is split in `2 ** (precision_bits - 1)` linear sub-buckets, so that the relative
+error of any recorded value is below `2 ** -(precision_bits - 1)` (< 1% by default), with
+a fixed (small) memory whatever the range, and O(1) recording.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+
+PRECISION_BITS = 8  # 128 sub-buckets per power of 2: < 0.8% error
+
+
+class Histogram:
+    """Counts of non-negative integer values (e.g. latencies in microseconds)."""
+
+    def __init__(self, precision_bits: int = PRECISION_BITS) -> None:
+        if precision_bits < 2:
+            raise ValueError(f'precision_bits too small: {precision_bits}')
+        self.precision_bits = precision_bits
+        self.counts: list[int] = []
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.precision_bits
+        if shift <= 0:
+            return value  # exact below `2 ** precision_bits`
+        return (shift << (self.precision_bits - 1)) + (value >> shift)
+
+    def _highest_value(self, index: int) -> int:
+        """Highest value counted in the bucket `index`."""
+        half = 1 << (self.precision_bits - 1)
+        if index < 2 * half:
+            return index
+        shift = (index >> (self.precision_bits - 1)) - 1
+        return ((index - (shift << (self.precision_bits - 1)) + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        if value < 0:
+            raise ValueError(f'negative value: {value}')
+        index = self._index(value)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += 1
+        if not self.count or value < self.min:
+            self.min = value
+        self.max = max(self.max, value)
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: Histogram) -> None:
+        if other.precision_bits != self.precision_bits:
+            raise ValueError('histograms of different precisions')
+        if not other.count:
+            return
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.min = other.min if not self.count else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> int:
+        """Value at `percent` (0-100): the highest value of its bucket (capped at `max`)."""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._highest_value(index), self.max)
+        return self.max
+
+    def percentiles(self, percents: Iterable[float] = (50, 90, 99, 99.9)) -> dict[str, int]:
+        """e.g. `{'p50': ..., 'p99': ..., 'p99.9': ...}`"""
+        return {f'p{percent:g}': self.percentile(percent) for percent in percents}
+
+    def to_dict(self) -> dict[str, object]:
+        """Summary and sparse buckets, JSON-serializable (see `from_dict()`)."""
+        return {
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'mean': round(self.mean, 3),
+            **self.percentiles(),
+            'precision_bits': self.precision_bits,
+            'buckets': {str(i): count for i, count in enumerate(self.counts) if count},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, object]) -> Histogram:
+        precision_bits = data['precision_bits']
+        buckets = data['buckets']
+        assert isinstance(precision_bits, int)
+        assert isinstance(buckets, dict)
+        histogram = cls(precision_bits)
+        for index, count in buckets.items():
+            index = int(index)
+            if index >= len(histogram.counts):
+                histogram.counts.extend([0] * (index + 1 - len(histogram.counts)))
+            histogram.counts[index] = count
+        for key in ('count', 'min', 'max'):
+            value = data[key]
+            assert isinstance(value, int)
+            setattr(histogram, key, value)
+        mean = data['mean']
+        assert isinstance(mean, int | float)
+        histogram.total = round(mean * histogram.count)
+        return histogram
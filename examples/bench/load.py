@@ -0,0 +1,172 @@
+"""Closed-Loop Load Generator
+
+`concurrency` clients, each with its own connection (TCP, UDS) or connected datagram
+socket (UDP), send one request and wait for its reply before sending the next one,
+all in one event loop (`$ASYNCIO_LOOP`, see `examples.core.event_loop`). The latency
+of a request is measured from just before its send to its complete reply, in
+microseconds.
+
+Closed-loop clients slow down with the server: at saturation, the requests that would
+have been sent while waiting are never sent, nor measured (coordinated omission), so
+latencies are only comparable between runs of the same concurrency.
+
+UDP: a reply not received within `UDP_TIMEOUT` counts as an error (lost), and the
+request is not retried. The first 8 bytes of each datagram are a sequence number, to
+discard late replies to lost requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import struct
+import time
+from contextlib import suppress
+
+from examples.bench.histogram import Histogram
+from examples.bench.servers import Address, Framing, ServerProcess, connect_unix
+from examples.core.event_loop import run
+from examples.core.framing import HEADER, pack_frame
+
+UDP_TIMEOUT = 0.1  # seconds
+SEQUENCE = struct.Struct('! Q')
+
+type Counts = tuple[int, int]  # requests, errors (measured)
+
+
+async def _stream_client(
+    address: Address,
+    framing: Framing,
+    payload: bytes,
+    measure_start: int,
+    deadline: int,
+    histogram: Histogram,
+) -> Counts:
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(sock=await connect_unix(address))
+    else:
+        reader, writer = await asyncio.open_connection(*address)  # `TCP_NODELAY` set
+
+    request = pack_frame(payload) if framing == 'framed' else payload
+    requests = 0
+    try:
+        while (start := time.perf_counter_ns()) < deadline:
+            writer.write(request)
+            if framing == 'framed':
+                (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+                await reader.readexactly(length)
+            else:  # raw echo: as many bytes as sent
+                await reader.readexactly(len(request))
+            if start >= measure_start:  # not a warmup request
+                histogram.record((time.perf_counter_ns() - start) // 1000)
+                requests += 1
+    finally:
+        writer.close()
+        with suppress(ConnectionError):
+            await writer.wait_closed()
+    return requests, 0
+
+
+async def _datagram_client(
+    address: tuple[str, int],
+    payload: bytes,
+    measure_start: int,
+    deadline: int,
+    histogram: Histogram,
+) -> Counts:
+    loop = asyncio.get_running_loop()
+    request = bytearray(payload)
+    requests = errors = sequence = 0
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setblocking(False)
+        sock.connect(address)
+        while (start := time.perf_counter_ns()) < deadline:
+            sequence += 1
+            SEQUENCE.pack_into(request, 0, sequence)
+            tag = request[: SEQUENCE.size]
+            await loop.sock_sendall(sock, request)
+            try:
+                async with asyncio.timeout(UDP_TIMEOUT):
+                    while (await loop.sock_recv(sock, len(request)))[: SEQUENCE.size] != tag:
+                        pass  # late reply to a lost request
+            except TimeoutError:
+                if start >= measure_start:
+                    errors += 1
+                continue
+            if start >= measure_start:
+                histogram.record((time.perf_counter_ns() - start) // 1000)
+                requests += 1
+    return requests, errors
+
+
+async def _load(
+    server: ServerProcess,
+    concurrency: int,
+    payload: bytes,
+    duration: float,
+    warmup: float,
+) -> tuple[Histogram, int, int]:
+    histogram = Histogram()
+    measure_start = time.perf_counter_ns() + int(warmup * 1e9)
+    deadline = measure_start + int(duration * 1e9)
+
+    async with asyncio.TaskGroup() as tg:
+        if server.spec.transport == 'udp':
+            assert not isinstance(server.address, str)
+            tasks = [
+                tg.create_task(
+                    _datagram_client(server.address, payload, measure_start, deadline, histogram)
+                )
+                for _ in range(concurrency)
+            ]
+        else:
+            tasks = [
+                tg.create_task(
+                    _stream_client(
+                        server.address,
+                        server.spec.framing,
+                        payload,
+                        measure_start,
+                        deadline,
+                        histogram,
+                    )
+                )
+                for _ in range(concurrency)
+            ]
+
+    requests = sum(task.result()[0] for task in tasks)
+    errors = sum(task.result()[1] for task in tasks)
+    return histogram, requests, errors
+
+
+def run_load(
+    name: str,
+    *,
+    port: int,
+    concurrency: int = 32,
+    message_size: int = 128,
+    duration: float = 5.0,
+    warmup: float = 1.0,
+) -> dict[str, object]:
+    """Start the server `name` (see `SERVERS`), load it for `warmup` + `duration`
+    seconds, stop it, and return the result (JSON-serializable).
+    """
+    if message_size < SEQUENCE.size:
+        raise ValueError(f'message size too small: {message_size} < {SEQUENCE.size}')
+    payload = b'x' * message_size
+
+    with ServerProcess(name, port) as server:
+        histogram, requests, errors = run(_load(server, concurrency, payload, duration, warmup))
+    return {
+        'server': name,
+        'mode': 'closed',
+        'transport': server.spec.transport,
+        'framing': server.spec.framing,
+        'concurrency': concurrency,
+        'message_size': message_size,
+        'duration': duration,
+        'requests': requests,
+        'errors': errors,
+        'throughput': round(requests / duration, 1),
+        'latency_us': histogram.to_dict(),
+    }
@@ -0,0 +1,238 @@
+"""Open-Loop Load Generator (Coordinated-Omission-Free)
+
+Requests are sent at a fixed target rate, on a schedule independent of the replies:
+request `i` is due at `start + i / rate`, round-robin over `connections` persistent
+connections (thousands, multiplexed by one event loop). Each connection is an
+`EchoClientProtocol` (of `examples.core.asyncio_tcp_client_low`) pipelining its
+requests: replies come back in order, and are matched first in, first out.
+
+The latency of a request is measured from its *intended* send time, not from its actual
+send: when the server (or the generator itself) falls behind, the queueing delay is
+counted in the latency of every request waiting behind, as a user would see it. A
+closed-loop client instead waits, sends less, and under-reports the tail (coordinated
+omission, see `examples.bench.load`).
+
+Stream servers only (TCP, UDS). All connections are established before the schedule
+starts (UDS: see `examples.bench.servers.connect_unix`), or the run fails. The throughput
+only counts the replies received before the end of the run; the replies drained after it
+are reported apart (their latencies are recorded), and the requests not answered within
+`DRAIN_TIMEOUT` count as errors.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import resource
+import time
+from collections import deque
+
+from examples.bench.histogram import Histogram
+from examples.bench.servers import SERVERS, Framing, ServerProcess, connect_unix
+from examples.core.asyncio_tcp_client_low import EchoClientProtocol
+from examples.core.event_loop import run
+from examples.core.framing import HEADER, pack_frame
+
+CONNECT_CONCURRENCY = 128  # connections opened at once (accept queue)
+DRAIN_TIMEOUT = 2.0  # seconds
+
+
+class LoadClientProtocol(EchoClientProtocol):
+    """Send requests on demand (`send()`), and record the latency of each reply."""
+
+    def __init__(
+        self,
+        message: bytes,
+        on_con_lost: asyncio.Future[bool],
+        *,
+        framing: Framing,
+        histogram: Histogram,
+        measure_start: int = 0,
+        deadline: int = 0,
+    ) -> None:
+        super().__init__(pack_frame(message) if framing == 'framed' else message, on_con_lost)
+        self.framing = framing
+        self.reply_size = len(message)  # raw echo
+        self.histogram = histogram
+        self.measure_start = measure_start
+        self.deadline = deadline
+        self.pending: deque[int] = deque()  # intended send times (ns), in flight
+        self.buffer = bytearray()
+        self.answered = 0  # measured, received before the deadline
+        self.drained = 0  # measured, received after the deadline
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        assert isinstance(transport, asyncio.Transport)
+        self.transport = transport  # nothing sent until due
+
+    def send(self, intended: int) -> bool:
+        if self.transport.is_closing():
+            return False
+        self.pending.append(intended)
+        self.transport.write(self.message)
+        return True
+
+    def data_received(self, data: bytes) -> None:
+        now = time.perf_counter_ns()
+        buffer = self.buffer
+        buffer += data
+        offset = 0
+        while True:
+            if self.framing == 'framed':
+                if len(buffer) - offset < HEADER.size:
+                    break
+                (length,) = HEADER.unpack_from(buffer, offset)
+                end = offset + HEADER.size + length
+            else:
+                end = offset + self.reply_size
+            if end > len(buffer):
+                break
+            offset = end
+            intended = self.pending.popleft()
+            if intended >= self.measure_start:  # not a warmup request
+                self.histogram.record((now - intended) // 1000)
+                if now < self.deadline:
+                    self.answered += 1
+                else:
+                    self.drained += 1
+        if offset:
+            del buffer[:offset]
+
+
+def _raise_nofile_limit(needed: int) -> None:
+    """One file descriptor per connection (and as many in the server process)."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        limit = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+
+
+async def _connect(
+    server: ServerProcess,
+    payload: bytes,
+    histogram: Histogram,
+    slots: asyncio.Semaphore,
+) -> LoadClientProtocol:
+    loop = asyncio.get_running_loop()
+
+    def factory() -> LoadClientProtocol:
+        return LoadClientProtocol(
+            payload,
+            loop.create_future(),
+            framing=server.spec.framing,
+            histogram=histogram,
+        )
+
+    async with slots:
+        if isinstance(server.address, str):
+            sock = await connect_unix(server.address)  # connected, or raises
+            _, protocol = await loop.create_unix_connection(factory, sock=sock)
+        else:
+            _, protocol = await loop.create_connection(factory, *server.address)
+    return protocol
+
+
+async def _load(
+    server: ServerProcess,
+    connections: int,
+    rate: float,
+    payload: bytes,
+    duration: float,
+    warmup: float,
+) -> tuple[Histogram, dict[str, int]]:
+    """Return the histogram and the counts: requests answered (before the deadline),
+    drained (answered after it), sent and failed (measured), connections lost, and the
+    highest lag of a send behind its schedule (microseconds).
+    """
+    histogram = Histogram()
+    slots = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    async with asyncio.TaskGroup() as tg:
+        tasks = [
+            tg.create_task(_connect(server, payload, histogram, slots)) for _ in range(connections)
+        ]
+    protocols = [task.result() for task in tasks]
+
+    start = time.perf_counter_ns()  # the schedule starts once all are connected
+    measure_start = start + int(warmup * 1e9)
+    deadline = measure_start + int(duration * 1e9)
+    for protocol in protocols:
+        protocol.measure_start, protocol.deadline = measure_start, deadline
+
+    interval = 1e9 / rate  # ns
+    sent = errors = max_lag = 0
+    i = 0
+    while (due := start + int(i * interval)) < deadline:
+        now = time.perf_counter_ns()
+        if due > now:
+            await asyncio.sleep((due - now) / 1e9)
+            continue
+        if due >= measure_start:
+            max_lag = max(max_lag, now - due)
+        while due <= now and due < deadline:  # all the requests due (late wakeup)
+            ok = protocols[i % connections].send(due)
+            if due >= measure_start:
+                sent += 1
+                errors += not ok
+            i += 1
+            due = start + int(i * interval)
+        await asyncio.sleep(0)  # process the replies between bursts, even when late
+
+    drain_deadline = time.perf_counter_ns() + int(DRAIN_TIMEOUT * 1e9)
+    while (
+        any(protocol.pending for protocol in protocols) and time.perf_counter_ns() < drain_deadline
+    ):
+        await asyncio.sleep(0.01)
+
+    answered = sum(protocol.answered for protocol in protocols)
+    drained = sum(protocol.drained for protocol in protocols)
+    errors += sum(
+        1 for protocol in protocols for intended in protocol.pending if intended >= measure_start
+    )
+    disconnected = sum(1 for protocol in protocols if protocol.on_con_lost.done())
+    for protocol in protocols:
+        protocol.transport.close()
+    return histogram, {
+        'requests': answered,
+        'drained': drained,
+        'sent': sent,
+        'errors': errors,
+        'disconnected': disconnected,
+        'max_send_lag_us': max_lag // 1000,
+    }
+
+
+def run_open_load(
+    name: str,
+    *,
+    port: int,
+    rate: float,
+    connections: int = 1000,
+    message_size: int = 128,
+    duration: float = 5.0,
+    warmup: float = 1.0,
+) -> dict[str, object]:
+    """Start the server `name` (see `SERVERS`), send `rate` requests/sec over
+    `connections` connections for `warmup` + `duration` seconds, stop it, and return the
+    result (JSON-serializable).
+    """
+    if rate <= 0:
+        raise ValueError(f'rate must be positive: {rate}')
+    if SERVERS[name].transport == 'udp':
+        raise ValueError(f'{name}: open loop over streams only (TCP, UDS)')
+    payload = b'x' * message_size
+    _raise_nofile_limit(2 * connections + 64)
+
+    with ServerProcess(name, port) as server:
+        histogram, counts = run(_load(server, connections, rate, payload, duration, warmup))
+    return {
+        'server': name,
+        'mode': 'open',
+        'transport': server.spec.transport,
+        'framing': server.spec.framing,
+        'concurrency': connections,
+        'rate': rate,
+        'message_size': message_size,
+        'duration': duration,
+        **counts,
+        'throughput': round(counts['requests'] / duration, 1),
+        'latency_us': histogram.to_dict(),
+    }
@@ -0,0 +1,207 @@
+"""Echo Servers under Benchmark, each run in a Subprocess
+
+A fresh interpreter per server: no state inherited from the load generator (event
+loop, module-level selector, logging), and the server competes for the CPU like in
+production. Logging below `WARNING` is disabled in the server process.
+
+Run one server (as the harness does):
+
+    python -m examples.bench.servers <name> <port or UDS path>
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Literal
+
+type Transport = Literal['tcp', 'udp', 'uds']
+type Framing = Literal['framed', 'raw']  # length-prefixed frames, or raw bytes echoed
+
+
+def _tcp_server_ipv4(port: str) -> None:
+    from examples.core.tcp_server_ipv4 import ByteHandler, create_tcp_server
+
+    with create_tcp_server(
+        ByteHandler,
+        keep_alive_idle=1800,
+        keep_alive_cnt=9,
+        keep_alive_intvl=15,
+        host='127.0.0.1',
+        port=int(port),
+        server_mode='threading',
+    ) as server:
+        server.serve_forever()
+
+
+def _asyncio_tcp_server(port: str) -> None:
+    from examples.core.asyncio_tcp_server import tcp_echo_server
+    from examples.core.event_loop import run
+
+    run(tcp_echo_server('127.0.0.1', int(port)))
+
+
+def _asyncio_tcp_server_low(port: str) -> None:
+    from examples.core.asyncio_tcp_server_low import FramedServerProtocol, tcp_echo_server
+    from examples.core.event_loop import run
+
+    run(tcp_echo_server('127.0.0.1', int(port), protocol_factory=FramedServerProtocol))
+
+
+def _io_multiplex_server(port: str) -> None:
+    from examples.core.io_multiplex_server import run_server
+
+    run_server('127.0.0.1', int(port))
+
+
+def _udp_server_asyncio(port: str) -> None:
+    from examples.core.event_loop import run
+    from examples.core.udp_server_asyncio import udp_echo_server
+
+    run(udp_echo_server('127.0.0.1', int(port)))
+
+
+def _udp_server_ipv4_timeout(port: str) -> None:
+    from examples.core.udp_server_ipv4_timeout import run_server
+
+    run_server('127.0.0.1', int(port))
+
+
+def _ipc_uds_rpc(path: str) -> None:
+    from examples.core.event_loop import run
+    from examples.core.ipc_uds_rpc import uds_rpc_server
+
+    run(uds_rpc_server(path))
+
+
+@dataclass(frozen=True, slots=True)
+class ServerSpec:
+    transport: Transport
+    framing: Framing
+    serve: Callable[[str], None]  # port (TCP, UDP) or path (UDS)
+
+
+SERVERS: dict[str, ServerSpec] = {
+    'tcp_server_ipv4': ServerSpec('tcp', 'framed', _tcp_server_ipv4),
+    'asyncio_tcp_server': ServerSpec('tcp', 'framed', _asyncio_tcp_server),
+    'asyncio_tcp_server_low': ServerSpec('tcp', 'framed', _asyncio_tcp_server_low),
+    'io_multiplex_server': ServerSpec('tcp', 'raw', _io_multiplex_server),
+    'udp_server_asyncio': ServerSpec('udp', 'raw', _udp_server_asyncio),
+    'udp_server_ipv4_timeout': ServerSpec('udp', 'raw', _udp_server_ipv4_timeout),
+    'ipc_uds_rpc': ServerSpec('uds', 'framed', _ipc_uds_rpc),
+}
+
+type Address = tuple[str, int] | str  # (host, port), or UDS path
+
+UDS_CONNECT_TIMEOUT = 10.0  # seconds, retrying while the accept queue is full
+UDS_CONNECT_RETRY_DELAY = 0.01  # seconds
+
+
+async def connect_unix(path: str) -> socket.socket:
+    """A connected (non-blocking) UDS socket, for `sock=` of `asyncio` connections.
+
+    A non-blocking UDS `connect()` to a full accept queue fails with `EAGAIN` at once, and
+    `loop.sock_connect()` (under `asyncio.open_unix_connection()`) then returns a socket
+    that is *not* connected: it is retried here instead, until `UDS_CONNECT_TIMEOUT`.
+    """
+    deadline = time.monotonic() + UDS_CONNECT_TIMEOUT
+    while True:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        try:
+            sock.connect(path)  # connected at once, or `EAGAIN`: no pending state
+            return sock
+        except BlockingIOError as err:
+            sock.close()
+            if time.monotonic() > deadline:
+                raise ConnectionRefusedError(
+                    f'{path}: accept queue full for {UDS_CONNECT_TIMEOUT} seconds'
+                ) from err
+        except BaseException:
+            sock.close()
+            raise
+        await asyncio.sleep(UDS_CONNECT_RETRY_DELAY)
+
+
+class ServerProcess:
+    """A server of `SERVERS`, started in a subprocess, ready when `start()` returns."""
+
+    def __init__(self, name: str, port: int) -> None:
+        self.name = name
+        self.spec = SERVERS[name]
+        self.address: Address
+        if self.spec.transport == 'uds':
+            self.address = os.path.join(tempfile.gettempdir(), f'bench-{name}-{port}.sock')
+        else:
+            self.address = ('127.0.0.1', port)
+        self.proc: subprocess.Popen[bytes] | None = None
+
+    def start(self, timeout: float = 10.0) -> None:
+        target = self.address if isinstance(self.address, str) else str(self.address[1])
+        self.proc = subprocess.Popen(
+            [sys.executable, '-m', 'examples.bench.servers', self.name, target],
+            stdout=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + timeout
+        while not self._ready():
+            if self.proc.poll() is not None:
+                raise RuntimeError(f'{self.name} exited: {self.proc.returncode}')
+            if time.monotonic() > deadline:
+                self.stop()
+                raise TimeoutError(f'{self.name} not ready within {timeout} seconds')
+            time.sleep(0.05)
+
+    def _ready(self) -> bool:
+        """Listening (stream), or echoing a probe (datagram)."""
+        family = socket.AF_UNIX if isinstance(self.address, str) else socket.AF_INET
+        sock_type = socket.SOCK_DGRAM if self.spec.transport == 'udp' else socket.SOCK_STREAM
+        with socket.socket(family, sock_type) as sock:
+            sock.settimeout(0.1)
+            try:
+                sock.connect(self.address)
+                if sock_type == socket.SOCK_DGRAM:
+                    sock.send(b'probe')
+                    sock.recv(16)
+            except OSError:
+                return False
+        return True
+
+    def stop(self) -> None:
+        if self.proc is None:
+            return
+        self.proc.terminate()
+        try:
+            self.proc.wait(5.0)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+
+    def __enter__(self) -> ServerProcess:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+
+if __name__ == '__main__':
+    name, target = sys.argv[1:3]
+    logging.disable(logging.INFO)
+    SERVERS[name].serve(target)
@@ -4,6 +4,7 @@ import asyncio
 import logging
 
 from examples.core.asyncio_tcp_server import HOST, PORT
+from examples.core.framing import HEADER, pack_frame
 
 logging.basicConfig(level=logging.DEBUG, style='{', format='[{threadName} ({thread})] {message}')
 
@@ -14,13 +15,15 @@ async def tcp_echo_client(host: str, port: int, data: bytes) -> None:
     assert isinstance(reader, asyncio.StreamReader)
     assert isinstance(writer, asyncio.StreamWriter)
 
-    writer.write(data)
+    writer.write(pack_frame(data))
     logging.debug(f'sent: {data!r}')
 
-    data = await reader.read(1024)
+    (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    data = await reader.readexactly(length)
     logging.debug(f'recv: {data!r}')
 
     writer.close()
 
 
-asyncio.run(tcp_echo_client(HOST, PORT, b'Hello World!'))
+if __name__ == '__main__':
+    asyncio.run(tcp_echo_client(HOST, PORT, b'Hello World!'))
@@ -9,8 +9,6 @@ from __future__ import annotations
 import asyncio
 import logging
 
-logging.basicConfig(level=logging.DEBUG, style='{', format='[{threadName} ({thread})] {message}')
-
 
 class EchoClientProtocol(asyncio.Protocol):
     def __init__(
@@ -67,4 +65,8 @@ async def tcp_echo_client(data: bytes) -> None:
         transport.close()
 
 
-asyncio.run(tcp_echo_client(b'Hello World!'))  # Python 3.7+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.DEBUG, style='{', format='[{threadName} ({thread})] {message}'
+    )
+    asyncio.run(tcp_echo_client(b'Hello World!'))  # Python 3.7+
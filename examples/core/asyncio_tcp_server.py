@@ -2,8 +2,15 @@
 
 import asyncio
 import logging
+import signal
 import socket
 import sys
+from functools import partial
+
+from examples.core.event_loop import run
+from examples.core.framing import HEADER, MAX_FRAME_SIZE
+from examples.core.prefork import Prefork
+from examples.core.timer_wheel import TimerWheel
 
 logging.basicConfig(level=logging.DEBUG, style='{', format='[{threadName} ({thread})] {message}')
 
@@ -14,15 +21,30 @@ KEEP_ALIVE_IDLE = 1800
 KEEP_ALIVE_CNT = 5
 KEEP_ALIVE_INTVL = 15
 
+IDLE_TIMEOUT = 300.0
+IDLE_TICK = 1.0
 
-async def handle_echo(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
-    client_address = writer.get_extra_info('peername')
-    logging.debug(f'connected from {client_address}')
+# transport buffer size (per connection) to `drain()` above
+WRITE_HIGH_WATERMARK = 64 * 1024
+
+# multi-process mode
+DRAIN_TIMEOUT = 10.0  # wait for clients to disconnect on shutdown
+HEALTH_INTERVAL = 5.0  # ping workers' event loops
 
-    sock: socket.socket = writer.get_extra_info('socket')
+
+def check_socket_options(
+    sock: socket.socket,
+    *,
+    keep_alive_idle: int | None = None,
+    keep_alive_cnt: int | None = None,
+    keep_alive_intvl: int | None = None,
+) -> None:
+    """Validate the options of a listening socket, once at startup.
+
+    Accepted sockets inherit them from the listener, so there is nothing to check (and no
+    `getsockopt()` system call to pay) per connection.
+    """
     assert sock.type is socket.SOCK_STREAM
-    assert sock.getpeername() == client_address
-    assert sock.getsockname() == writer.get_extra_info('sockname')  # server address
     assert sock.gettimeout() == 0
     assert bool(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
     assert bool(sock.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR))
@@ -30,19 +52,21 @@ async def handle_echo(reader: asyncio.StreamReader, writer: asyncio.StreamWriter
     if hasattr(socket, 'TCP_QUICKACK'):
         assert sys.platform == 'linux'
         assert bool(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK))
-    assert bool(sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
-    if sys.platform == 'linux':
-        # Keep Idle, Linux 2.4+
-        assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE) == KEEP_ALIVE_IDLE
 
+    if keep_alive_idle is not None and keep_alive_cnt is not None and keep_alive_intvl is not None:
+        assert bool(sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE))
+        if sys.platform == 'linux':  # Linux 2.4+
+            assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE) == keep_alive_idle
+        elif hasattr(socket, 'TCP_KEEPALIVE'):  # macOS and Python 3.10+
+            assert sys.platform == 'darwin' and sys.version_info >= (3, 10)
+            assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE) == keep_alive_idle
+        assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT) == keep_alive_cnt
+        assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL) == keep_alive_intvl
+
+    if sys.platform == 'linux':
         # Fast Open, Linux 3.7+
-        fastopen = sock.getsockopt(socket.SOL_SOCKET, socket.TCP_FASTOPEN)
+        fastopen = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_FASTOPEN)
         logging.debug(f'Fast Open: {fastopen}')
-    elif hasattr(socket, 'TCP_KEEPALIVE'):  # macOS and Python 3.10+
-        assert sys.platform == 'darwin' and sys.version_info >= (3, 10)
-        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, KEEP_ALIVE_IDLE)
-    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT) == KEEP_ALIVE_CNT
-    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL) == KEEP_ALIVE_INTVL
 
     # recv buffer size
     # max: /proc/sys/net/core/rmem_max
@@ -56,18 +80,63 @@ async def handle_echo(reader: asyncio.StreamReader, writer: asyncio.StreamWriter
     send_buff_size: int = sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
     logging.debug(f'send buffer size: {send_buff_size}')
 
-    # logging.debug(dir(sock))
 
-    # Recv
-    data = await reader.read(100)
-    logging.debug(f'recv: {data!r}')
+async def handle_echo(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    idle: TimerWheel[asyncio.StreamWriter] | None = None,
+    max_frame_size: int = MAX_FRAME_SIZE,
+) -> None:
+    """Echo length-prefixed frames (see `framing`) over a persistent connection.
+
+    Replies are only queued in the transport, which coalesces them while the socket is
+    busy; `drain()` is awaited only when its buffer exceeds `WRITE_HIGH_WATERMARK`.
+    """
+    client_address = writer.get_extra_info('peername')
+    logging.debug(f'connected from {client_address}')
+
+    transport = writer.transport
+    transport.set_write_buffer_limits(high=WRITE_HIGH_WATERMARK)
+
+    if idle is not None:
+        idle.touch(writer)
+    try:
+        # Recv, until EOF (or closed by `reap_idle()`)
+        while True:
+            header = await reader.readexactly(HEADER.size)
+            (length,) = HEADER.unpack(header)
+            if length > max_frame_size:
+                raise ValueError(f'frame too large: {length} > {max_frame_size}')
+            payload = await reader.readexactly(length)
+            if idle is not None:
+                idle.touch(writer)
+
+            # Send: same header, no concatenation copy
+            writer.writelines((header, payload))
+            if transport.get_write_buffer_size() > WRITE_HIGH_WATERMARK:
+                await writer.drain()
+    except asyncio.IncompleteReadError as err:
+        if err.partial:
+            logging.warning(f'{client_address}: closed with partial frame: {len(err.partial)}')
+    except (ConnectionError, ValueError) as err:
+        logging.debug(f'{client_address}: {err!r}')
+    finally:
+        if idle is not None:
+            idle.remove(writer)
+        writer.close()
+
 
-    # Send
-    writer.write(data)
-    await writer.drain()
-    logging.debug(f'sent: {data!r}')
+async def reap_idle(idle: TimerWheel[asyncio.StreamWriter]) -> None:
+    """Close idle connections, once per tick of the timer wheel.
 
-    writer.close()
+    One task for all connections, instead of one `loop.call_later()` timer (a heap entry,
+    rescheduled on every read) per connection.
+    """
+    while True:
+        await asyncio.sleep(idle.tick)
+        for writer in idle.advance():
+            logging.debug(f'close idle connection {writer.get_extra_info("peername")}')
+            writer.close()  # `reader.readexactly()` raises `IncompleteReadError` then
 
 
 async def tcp_echo_server(
@@ -79,11 +148,24 @@ async def tcp_echo_server(
     keep_alive_cnt: int | None = None,
     keep_alive_intvl: int | None = None,
     allow_fastopen: bool | None = None,
+    idle_timeout: float | None = None,
     start_serving: bool = False,
+    stop: asyncio.Event | None = None,
+    drain_timeout: float = DRAIN_TIMEOUT,
 ) -> None:
+    """
+    :param `idle_timeout`: close connections without any activity for this many seconds,
+        long before the TCP keep-alive probes (`TCP_KEEPIDLE`) do. `None` to disable.
+    :param `stop`: serve until set, then stop accepting, and wait for clients to
+        disconnect, up to `drain_timeout` seconds. Serve forever if `None`.
+    """
+    idle: TimerWheel[asyncio.StreamWriter] | None = None
+    if idle_timeout is not None:
+        idle = TimerWheel(idle_timeout, min(IDLE_TICK, idle_timeout))
+
     # Low-level APIs: loop.create_server()
     server = await asyncio.start_server(
-        handle_echo,
+        partial(handle_echo, idle=idle),
         host,
         port,
         reuse_address=True,
@@ -103,10 +185,6 @@ async def tcp_echo_server(
         assert not bool(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
         sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
-        assert bool(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
-        assert bool(sock.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR))
-        assert bool(sock.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT))
-
         # Keep-Alive
         if (
             keep_alive_cnt is not None
@@ -122,25 +200,125 @@ async def tcp_echo_server(
             sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, keep_alive_cnt)
             sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, keep_alive_intvl)
 
-        # QUICK ACK
-        if hasattr(socket, 'TCP_QUICKACK'):
-            assert sys.platform == 'linux'
-            assert bool(sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK))
-
         # Fast Open, Linux 3.7+
         if sys.platform == 'linux':
             if allow_fastopen is not None:
                 val = 2 if allow_fastopen else 0
-                sock.setsockopt(socket.SOL_SOCKET, socket.TCP_FASTOPEN, val)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_FASTOPEN, val)
+
+        check_socket_options(
+            sock,
+            keep_alive_idle=keep_alive_idle,
+            keep_alive_cnt=keep_alive_cnt,
+            keep_alive_intvl=keep_alive_intvl,
+        )
 
     # `asyncio.Server` object is an asynchronous context manager since Python 3.7.
     if not start_serving:
         async with server:
-            await server.serve_forever()
+            reaper = None if idle is None else asyncio.create_task(reap_idle(idle))
+            try:
+                if stop is None:
+                    await server.serve_forever()
+                else:
+                    await server.start_serving()
+                    await stop.wait()
+                    await drain(server, drain_timeout)
+            finally:
+                if reaper is not None:
+                    reaper.cancel()
+
+
+async def drain(server: asyncio.Server, timeout: float) -> None:
+    """Stop accepting, then wait for open connections to finish (graceful shutdown)."""
+    logging.debug(f'draining {server.sockets}')
+    server.close()  # close listening sockets only
+    try:
+        async with asyncio.timeout(timeout):
+            # Python 3.12+: also waits for all connections to be closed
+            await server.wait_closed()
+    except TimeoutError:
+        logging.warning('drain timed out, closing remaining connections')
+        server.close_clients()  # Python 3.13+
+        await server.wait_closed()
+
+
+def answer_health_pings(channel: socket.socket, stop: asyncio.Event) -> None:
+    """Echo the supervisor's pings (see `Prefork`) from the event loop.
+
+    A blocked event loop stops answering, so the supervisor kills and restarts the worker.
+    """
+    loop = asyncio.get_running_loop()
+    channel.setblocking(False)
+
+    def on_ping() -> None:
+        try:
+            data = channel.recv(64)
+        except BlockingIOError:
+            return
+        if data:
+            channel.send(data)
+        else:
+            logging.warning('supervisor gone, stopping')
+            loop.remove_reader(channel)
+            stop.set()
+
+    loop.add_reader(channel, on_ping)
+
+
+def run_tcp_echo_workers(
+    host: str,
+    port: int,
+    workers: int | None = None,
+    *,
+    accept_queue_size: int = socket.SOMAXCONN,
+    keep_alive_idle: int | None = None,
+    keep_alive_cnt: int | None = None,
+    keep_alive_intvl: int | None = None,
+    allow_fastopen: bool | None = None,
+    idle_timeout: float | None = None,
+    drain_timeout: float = DRAIN_TIMEOUT,
+    health_interval: float = HEALTH_INTERVAL,
+) -> None:
+    """Run `tcp_echo_server()` in `workers` processes (default: CPU count, POSIX only).
+
+    Each process runs its own event loop, and binds the same port with `SO_REUSEPORT`, so
+    the kernel load-balances connections across them. `Prefork` pings each event loop
+    every `health_interval` seconds, and restarts crashed or hung workers. On `SIGTERM`
+    (or Ctrl-C), each worker drains its connections before exit.
+    """
+    if not port:
+        raise ValueError('multiple workers require a fixed port')
+
+    async def serve(channel: socket.socket) -> None:
+        stop = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        answer_health_pings(channel, stop)
+        await tcp_echo_server(
+            host,
+            port,
+            accept_queue_size=accept_queue_size,
+            keep_alive_idle=keep_alive_idle,
+            keep_alive_cnt=keep_alive_cnt,
+            keep_alive_intvl=keep_alive_intvl,
+            allow_fastopen=allow_fastopen,
+            idle_timeout=idle_timeout,
+            stop=stop,
+            drain_timeout=drain_timeout,
+        )
+
+    def target(_worker_id: int) -> None:
+        assert supervisor.channel is not None
+        run(serve(supervisor.channel))
+
+    supervisor = Prefork(target, workers, health_interval=health_interval)
+    supervisor.run()
 
 
 if __name__ == '__main__':
-    asyncio.run(
+    # event loop: `$ASYNCIO_LOOP`, 'auto' (default), 'asyncio' or 'uvloop'
+    # `run_tcp_echo_workers()` for one event loop per CPU core
+    run(
         tcp_echo_server(
             HOST,
             PORT,
@@ -148,5 +326,6 @@ if __name__ == '__main__':
             keep_alive_cnt=KEEP_ALIVE_CNT,
             keep_alive_intvl=KEEP_ALIVE_INTVL,
             allow_fastopen=None,
+            idle_timeout=IDLE_TIMEOUT,
         )
     )
@@ -10,9 +10,17 @@ import asyncio
 import logging
 import socket
 import sys
+from collections.abc import Callable
+
+from examples.core.buffer_pool import BufferPool
+from examples.core.event_loop import run
+from examples.core.framing import HEADER, MAX_FRAME_SIZE
 
 logging.basicConfig(level=logging.DEBUG, style='{', format='[{threadName} ({thread})] {message}')
 
+# one buffer per framed connection: room for one frame of `MAX_FRAME_SIZE`
+frame_buffer_pool = BufferPool(HEADER.size + MAX_FRAME_SIZE)
+
 # TCP_QUICKACK = True
 recv_bufsize: int | None = None
 send_bufsize: int | None = None
@@ -65,17 +73,100 @@ class EchoServerProtocol(asyncio.Protocol):
         self.transport.close()
 
 
+class FramedServerProtocol(asyncio.BufferedProtocol):
+    """Serve length-prefixed frames (see `framing`) over a persistent connection.
+
+    `asyncio.Protocol.data_received()` gets a new `bytes` object per chunk.
+    `asyncio.BufferedProtocol` lets the transport `recv_into()` a buffer of ours instead:
+    `get_buffer()` returns its free tail, and `buffer_updated()` parses the frames in
+    place, as `memoryview`s into it. The partial tail (if any) is moved to the buffer head
+    before the next read, so a frame is always contiguous.
+
+    The buffer is a slab of `frame_buffer_pool`, held for the connection lifetime.
+    """
+
+    def __init__(self) -> None:
+        self.max_frame_size = MAX_FRAME_SIZE
+        self.start = 0  # first unparsed byte
+        self.end = 0  # end of received data
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        assert isinstance(transport, asyncio.Transport)
+        self.transport = transport  # pylint: disable=attribute-defined-outside-init
+        self.client_address = transport.get_extra_info('peername')
+        self.view = frame_buffer_pool.acquire()
+        logging.debug(f'connected from {self.client_address}')
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        if self.start:
+            # move the partial tail to the head (memmove)
+            size = self.end - self.start
+            self.view[:size] = self.view[self.start : self.end]
+            self.start, self.end = 0, size
+        return self.view[self.end :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self.end += nbytes
+
+        replies: list[bytes] = []
+        while self.end - self.start >= HEADER.size:
+            (length,) = HEADER.unpack_from(self.view, self.start)
+            if length > self.max_frame_size:
+                logging.error(f'{self.client_address}: frame too large: {length}')
+                self.transport.abort()
+                return
+            frame_end = self.start + HEADER.size + length
+            if frame_end > self.end:
+                break  # partial frame, wait for more data
+            reply = self.handle_frame(self.view[self.start + HEADER.size : frame_end])
+            replies += (HEADER.pack(len(reply)), reply)
+            self.start = frame_end
+
+        if self.start == self.end:
+            self.start = self.end = 0
+
+        # All replies of one read in one `sendmsg()`.
+        # The transport keeps references to (not copies of) the data it could not send
+        # at once, so never write views into the (reused) receive buffer.
+        if replies:
+            self.transport.writelines(replies)
+
+    def handle_frame(self, payload: memoryview) -> bytes:
+        """Handle one frame, return the reply payload.
+
+        `payload` is only valid until return.
+        """
+        return payload.tobytes()
+
+    # Backpressure: stop reading from a peer that does not read its replies.
+    def pause_writing(self) -> None:
+        self.transport.pause_reading()
+
+    def resume_writing(self) -> None:
+        self.transport.resume_reading()
+
+    def eof_received(self) -> bool | None:
+        if self.end:
+            logging.warning(f'{self.client_address}: closed with partial frame: {self.end}')
+        return None  # close the transport
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        logging.debug(f'disconnected from {self.client_address}: {exc!r}')
+        frame_buffer_pool.release(self.view)
+
+
 async def tcp_echo_server(
     host: str,
     port: int,
     *,
     backlog: int = socket.SOMAXCONN,
+    protocol_factory: Callable[[], asyncio.BaseProtocol] = EchoServerProtocol,
 ) -> None:
     loop = asyncio.get_running_loop()
 
     # The socket option `TCP_NODELAY` is set by default in Python 3.6+
     server = await loop.create_server(
-        EchoServerProtocol,
+        protocol_factory,
         host,
         port,
         reuse_address=True,
@@ -95,4 +186,7 @@ async def tcp_echo_server(
         await server.serve_forever()
 
 
-asyncio.run(tcp_echo_server('127.0.0.1', 8888))  # Python 3.7+
+if __name__ == '__main__':
+    # `FramedServerProtocol` for length-prefixed frames
+    # event loop: `$ASYNCIO_LOOP`, 'auto' (default), 'asyncio' or 'uvloop'
+    run(tcp_echo_server('127.0.0.1', 8888))
@@ -0,0 +1,115 @@
+"""Buffer Pool - Zero-Copy `recv_into()` / `recvfrom_into()`
+
+`sock.recv(n)` allocates a new `bytes` object of `n` bytes on every call (then shrinks
+it to the received size). `sock.recv_into(buf)` fills an existing buffer instead, so a
+server loop can reuse a few fixed-size buffers and stop churning the allocator.
+
+`BufferPool` preallocates one `bytearray` arena, split into fixed-size slabs handed out
+as `memoryview`s (no copy), and returned to the pool on release.
+
+Benchmark (allocated bytes per message, `recv()` vs `recv_into()`):
+
+    python -m examples.core.buffer_pool
+"""
+
+import socket
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+SLAB_SIZE = 64 * 1024
+
+
+class BufferPool:
+    """Pool of fixed-size buffers, handed out as `memoryview`s.
+
+    `acquire()` falls back to allocating a new slab when the pool is exhausted. On
+    `release()`, such a slab joins the pool only if it holds fewer than `count` free
+    slabs, else it is dropped (freed): the pool does not keep the peak allocation.
+
+    `list.append()` and `list.pop()` are atomic, so the pool is thread-safe.
+    """
+
+    def __init__(self, slab_size: int = SLAB_SIZE, count: int = 16) -> None:
+        self.slab_size = slab_size
+        self.count = count
+        self._arena = memoryview(bytearray(slab_size * count))
+        self._free: list[memoryview] = [
+            self._arena[i * slab_size : (i + 1) * slab_size] for i in range(count)
+        ]
+        self.misses = 0  # number of slabs allocated after exhausted
+
+    def acquire(self) -> memoryview:
+        try:
+            return self._free.pop()
+        except IndexError:
+            self.misses += 1
+            return memoryview(bytearray(self.slab_size))
+
+    def release(self, buf: memoryview) -> None:
+        assert len(buf) == self.slab_size
+        if buf.obj is not self._arena.obj and len(self._free) >= self.count:
+            return  # allocated on a miss, and the pool is full again: drop it
+        self._free.append(buf)
+
+    @contextmanager
+    def buffer(self) -> Iterator[memoryview]:
+        buf = self.acquire()
+        try:
+            yield buf
+        finally:
+            self.release(buf)
+
+
+# shared by all servers of one process
+buffer_pool = BufferPool()
+
+
+def _bench(name: str, recv_one: Callable[[], object], count: int) -> None:
+    # warm up
+    for _ in range(100):
+        recv_one()
+
+    allocated = 0
+    t0 = time.perf_counter()
+    for _ in range(count):
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        recv_one()
+        allocated += tracemalloc.get_traced_memory()[1] - baseline
+    elapsed = time.perf_counter() - t0
+
+    print(
+        f'{name:>12}: {allocated / count:8.1f} allocated bytes/msg, '
+        f'{elapsed / count * 1e6:6.2f} usec/msg (traced)'
+    )
+
+
+def benchmark(count: int = 100_000, message_size: int = 512) -> None:
+    message = b'x' * message_size
+    server, client = socket.socketpair()
+    with server, client:
+
+        def recv_bytes() -> object:
+            client.sendall(message)
+            return server.recv(1024)
+
+        def recv_into_pool() -> object:
+            client.sendall(message)
+            buf = buffer_pool.acquire()
+            try:
+                return server.recv_into(buf, 1024)
+            finally:
+                buffer_pool.release(buf)
+
+        tracemalloc.start()
+        try:
+            _bench('recv', recv_bytes, count)
+            _bench('recv_into', recv_into_pool, count)
+        finally:
+            tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    benchmark()
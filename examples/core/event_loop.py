@@ -0,0 +1,182 @@
+"""Pluggable Event Loop - `asyncio.Runner(loop_factory=...)`
+
+`asyncio.run()` always runs the default event loop. `asyncio.Runner` (Python 3.11+)
+takes a `loop_factory` instead, so an entry point can choose the event loop
+implementation without `asyncio.set_event_loop_policy()` (deprecated since 3.14):
+
+- `'asyncio'`: the stock event loop;
+- `'uvloop'`: `uvloop` (on top of `libuv`, optional, installed with `uvicorn[standard]`);
+- `'auto'`: `uvloop` if installed, else the stock one.
+
+Chosen by argument, or by the environment variable `ASYNCIO_LOOP`.
+
+Benchmark (requests/sec of each echo server, under each event loop):
+
+    python -m examples.core.event_loop
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import time
+from collections.abc import Callable, Coroutine
+from typing import Literal, get_args
+
+from examples.core.framing import HEADER, pack_frame
+
+logger = logging.getLogger()
+
+type LoopName = Literal['auto', 'asyncio', 'uvloop']
+type LoopFactory = Callable[[], asyncio.AbstractEventLoop]
+
+LOOP_ENV = 'ASYNCIO_LOOP'
+
+
+def get_loop_factory(name: LoopName | None = None) -> LoopFactory:
+    """Return the factory of the event loop `name` (default: `$ASYNCIO_LOOP` or `'auto'`).
+
+    :raise `ValueError`: unknown name.
+    :raise `ImportError`: `'uvloop'` not installed.
+    """
+    loop_name = name or os.environ.get(LOOP_ENV, 'auto')
+    if loop_name not in get_args(LoopName.__value__):
+        raise ValueError(f'unknown event loop: {loop_name!r}')
+
+    if loop_name == 'asyncio':
+        return asyncio.new_event_loop
+    try:
+        import uvloop
+    except ImportError:
+        if loop_name == 'uvloop':
+            raise
+        logger.debug('uvloop not installed, fall back to asyncio event loop')
+        return asyncio.new_event_loop
+    return uvloop.new_event_loop
+
+
+def run[T](
+    main: Coroutine[object, object, T],
+    *,
+    loop: LoopName | None = None,
+    debug: bool | None = None,
+) -> T:
+    """`asyncio.run()`, on the event loop chosen by `get_loop_factory()`."""
+    with asyncio.Runner(debug=debug, loop_factory=get_loop_factory(loop)) as runner:
+        return runner.run(main)
+
+
+# Benchmark
+
+
+def _serve_tcp_streams(port: int) -> Coroutine[object, object, None]:
+    from examples.core.asyncio_tcp_server import tcp_echo_server
+
+    return tcp_echo_server('127.0.0.1', port)
+
+
+def _serve_tcp_buffered(port: int) -> Coroutine[object, object, None]:
+    from examples.core.asyncio_tcp_server_low import FramedServerProtocol, tcp_echo_server
+
+    return tcp_echo_server('127.0.0.1', port, protocol_factory=FramedServerProtocol)
+
+
+def _serve_udp(port: int) -> Coroutine[object, object, None]:
+    from examples.core.udp_server_asyncio import udp_echo_server
+
+    return udp_echo_server('127.0.0.1', port)
+
+
+async def _echo_client(port: int, payload: bytes, deadline: float) -> int:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    frame = pack_frame(payload)
+    count = 0
+    try:
+        while time.perf_counter() < deadline:
+            writer.write(frame)
+            (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+            await reader.readexactly(length)
+            count += 1
+    finally:
+        writer.close()
+    return count
+
+
+async def _udp_echo_client(port: int, payload: bytes, deadline: float) -> int:
+    loop = asyncio.get_running_loop()
+    count = 0
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setblocking(False)
+        sock.connect(('127.0.0.1', port))
+        while time.perf_counter() < deadline:
+            await loop.sock_sendall(sock, payload)
+            try:
+                async with asyncio.timeout(0.1):  # lost datagram: send the next one
+                    await loop.sock_recv(sock, len(payload))
+            except TimeoutError:
+                continue
+            count += 1
+    return count
+
+
+type Serve = Callable[[int], Coroutine[object, object, None]]
+type Client = Callable[[int, bytes, float], Coroutine[object, object, int]]
+
+# name -> (coroutine serving echo on the port, ping-pong client returning requests done)
+BENCH_SERVERS: dict[str, tuple[Serve, Client]] = {
+    'asyncio_tcp_server': (_serve_tcp_streams, _echo_client),
+    'asyncio_tcp_server_low': (_serve_tcp_buffered, _echo_client),
+    'udp_server_asyncio': (_serve_udp, _udp_echo_client),
+}
+
+
+def _run_server(server: str, port: int, loop: LoopName) -> None:
+    logging.disable(logging.INFO)
+    serve, _client = BENCH_SERVERS[server]
+    run(serve(port), loop=loop)
+
+
+async def _load(
+    client: Client, port: int, connections: int, payload: bytes, duration: float
+) -> int:
+    deadline = time.perf_counter() + duration
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(client(port, payload, deadline)) for _ in range(connections)]
+    return sum(task.result() for task in tasks)
+
+
+def benchmark(
+    *,
+    connections: int = 32,
+    message_size: int = 128,
+    duration: float = 3.0,
+    port: int = 18888,
+) -> None:
+    """Run each server in a child process, under each event loop, and measure requests/sec
+    from this process (always on the stock event loop, for the same client cost).
+    """
+    loops: list[LoopName] = ['asyncio']
+    try:
+        get_loop_factory('uvloop')
+        loops.append('uvloop')
+    except ImportError:
+        print('uvloop not installed, benchmark the stock event loop only')
+
+    payload = b'x' * message_size
+    for server, (_serve, client) in BENCH_SERVERS.items():
+        for loop in loops:
+            proc = multiprocessing.Process(target=_run_server, args=(server, port, loop))
+            proc.start()
+            try:
+                time.sleep(0.5)  # wait for listening
+                count = asyncio.run(_load(client, port, connections, payload, duration))
+            finally:
+                proc.terminate()
+                proc.join()
+            print(f'{server:>24} [{loop:>7}]: {count / duration:10.0f} requests/sec')
+            port += 1  # avoid TIME_WAIT of the last run
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,184 @@
+"""File Descriptor Handoff - One Acceptor, a Pool of Worker Processes (SCM_RIGHTS)
+
+One acceptor process `accept()`s the connections, and passes their file descriptors to
+worker processes over Unix domain sockets (`socket.send_fds()` / `socket.recv_fds()`,
+Python 3.9+). Compared with `SO_REUSEPORT` (the kernel hashes each connection to one of
+the listeners):
+
+- even load: `'least_loaded'` picks the worker with the fewest connections (reported
+  by the workers after each change), whatever the connection lifetimes;
+- zero-downtime worker replacement: a worker about to leave reports `DRAINING`, and gets
+  no more connections. The supervisor (`Prefork`) holds both ends of each channel: the
+  connections passed to a worker being restarted wait in its channel, and its
+  replacement inherits them (and reports its load, to get new ones again).
+
+Channels are `socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)` (Linux 2.6.4+),
+to preserve message boundaries.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import selectors
+import socket
+import struct
+from collections.abc import Callable
+from typing import Literal
+
+from examples.core.prefork import Prefork
+
+logger = logging.getLogger()
+
+type Balance = Literal['round_robin', 'least_loaded']
+
+LOAD = struct.Struct('! I')  # number of connections of a worker
+DRAINING = 0xFFFFFFFF  # load reported by a leaving worker: no more connections
+MAX_FDS = 64  # max number of fds per `recv_fds()`
+
+
+def new_channels(workers: int) -> list[tuple[socket.socket, socket.socket]]:
+    """Create one channel per worker: (acceptor end, worker end)."""
+    return [socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET) for _ in range(workers)]
+
+
+class WorkerChannel:
+    """Worker end of a channel: receive connections, report the load."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def recv_connections(self) -> list[socket.socket]:
+        """Receive the connections passed in (blocking).
+
+        :raise `EOFError`: the channel is closed.
+        """
+        msg, fds, _flags, _addr = socket.recv_fds(self.sock, 1, MAX_FDS)
+        if not msg:
+            raise EOFError('acceptor channel closed')
+        return [socket.socket(fileno=fd) for fd in fds]
+
+    def report_load(self, load: int) -> None:
+        self.sock.send(LOAD.pack(load))
+
+    def report_draining(self) -> None:
+        self.sock.send(LOAD.pack(DRAINING))
+
+
+class Acceptor:
+    """Accept connections, and pass each one to a worker.
+
+    Draining workers get no more connections (unless all are). A channel that cannot
+    take more (its worker is gone or hung, and the channel buffer is full) is skipped.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        channels: list[socket.socket],
+        *,
+        balance: Balance = 'least_loaded',
+    ) -> None:
+        self.sock = sock
+        self.channels = channels
+        for channel in channels:
+            channel.setblocking(False)
+        self.balance = balance
+        self.loads = [0] * len(channels)  # number of connections per worker
+        self._round_robin = itertools.count()
+
+    def pick(self, exclude: set[int]) -> int | None:
+        candidates = [i for i in range(len(self.channels)) if i not in exclude]
+        available = [i for i in candidates if self.loads[i] != DRAINING] or candidates
+        if not available:
+            return None
+        if self.balance == 'least_loaded':
+            return min(available, key=self.loads.__getitem__)
+        return available[next(self._round_robin) % len(available)]
+
+    def dispatch(self, conn: socket.socket) -> int | None:
+        """Pass `conn` to a worker, and close it here. Return the worker id."""
+        exclude: set[int] = set()
+        try:
+            while (worker_id := self.pick(exclude)) is not None:
+                try:
+                    # duplicate the fd into the worker process
+                    socket.send_fds(self.channels[worker_id], [b'\0'], [conn.fileno()])
+                except BlockingIOError:
+                    logger.warning(f'worker {worker_id} channel full, skip')
+                    exclude.add(worker_id)
+                    continue
+                if self.loads[worker_id] != DRAINING:
+                    self.loads[worker_id] += 1
+                return worker_id
+            logger.error('no worker available, connection dropped')
+            return None
+        finally:
+            conn.close()
+
+    def handle_report(self, worker_id: int) -> None:
+        # one message per record (`SOCK_SEQPACKET`)
+        while True:
+            try:
+                data = self.channels[worker_id].recv(LOAD.size)
+            except BlockingIOError:
+                return
+            if not data:
+                return
+            (self.loads[worker_id],) = LOAD.unpack(data)
+            if self.loads[worker_id] == DRAINING:
+                logger.debug(f'worker {worker_id} draining')
+
+    def run(self, timeout: float | None = None) -> None:
+        selector = selectors.DefaultSelector()
+        selector.register(self.sock, selectors.EVENT_READ)
+        for worker_id, channel in enumerate(self.channels):
+            selector.register(channel, selectors.EVENT_READ, worker_id)
+        try:
+            while True:
+                for key, _mask in selector.select(timeout):
+                    if key.fileobj is self.sock:
+                        try:
+                            conn, client_address = self.sock.accept()
+                        except BlockingIOError:
+                            continue
+                        logger.debug(f'pass {client_address} to worker {self.dispatch(conn)}')
+                    else:
+                        self.handle_report(key.data)
+        finally:
+            selector.close()
+
+
+def run_pool(
+    sock: socket.socket,
+    workers: int,
+    serve: Callable[[WorkerChannel], object],
+    *,
+    balance: Balance = 'least_loaded',
+    timeout: float | None = None,
+) -> None:
+    """Run one acceptor process on the listener `sock`, and `workers` worker processes
+    running `serve(channel)`, all supervised by `Prefork` (POSIX only).
+
+    `serve()` reports its load at start and after each change, and `DRAINING` before
+    leaving. Any worker leaving is replaced: e.g. `SIGTERM` the workers one by one to
+    replace them all, without refusing a connection.
+    """
+    pairs = new_channels(workers)
+
+    def target(worker_id: int) -> None:
+        if worker_id == 0:
+            Acceptor(sock, [a for a, _ in pairs], balance=balance).run(timeout)
+        else:
+            sock.close()
+            serve(WorkerChannel(pairs[worker_id - 1][1]))
+
+    try:
+        Prefork(target, workers + 1, restart='always').run()
+    finally:
+        for a, b in pairs:
+            a.close()
+            b.close()
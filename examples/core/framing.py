@@ -0,0 +1,173 @@
+"""Length-Prefixed Message Framing (for stream sockets)
+
+TCP is a byte stream: one `send()` may arrive as several `recv()`s (short reads), and
+several `send()`s may arrive as one `recv()`. Each message (frame) is prefixed with its
+payload length, as a 4-byte unsigned int in network byte order:
+
+    +------------------+------------------+
+    | length (4 bytes) | payload (length) |
+    +------------------+------------------+
+
+Fixed-size records (e.g. binary telemetry) need no prefix: `RecordReader` splits the
+stream every `record.size` bytes.
+"""
+
+import logging
+import socket
+import struct
+from collections.abc import Iterator
+from typing import Any
+
+logger = logging.getLogger()
+
+HEADER = struct.Struct('! I')
+MAX_FRAME_SIZE = 64 * 1024  # max payload size
+BUFFER_SIZE = 256 * 1024
+
+
+def pack_frame(payload: bytes | bytearray | memoryview) -> bytes:
+    return HEADER.pack(len(payload)) + payload
+
+
+def send_frame(sock: socket.socket, payload: bytes | bytearray | memoryview) -> None:
+    sock.sendall(pack_frame(payload))
+
+
+def recv_exactly(sock: socket.socket, size: int) -> bytearray:
+    """Receive exactly `size` bytes (blocking).
+
+    :raise `EOFError`: the peer closed the connection before `size` bytes received.
+    """
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if not n:
+            raise EOFError(f'connection closed after {received}/{size} bytes')
+        received += n
+    return buf
+
+
+def recv_frame(sock: socket.socket, max_frame_size: int = MAX_FRAME_SIZE) -> bytearray:
+    """Receive one frame (blocking), return its payload."""
+    (length,) = HEADER.unpack(recv_exactly(sock, HEADER.size))
+    if length > max_frame_size:
+        raise ValueError(f'frame too large: {length} > {max_frame_size}')
+    return recv_exactly(sock, length)
+
+
+class FrameReader:
+    """Reassemble frames from a stream socket into a preallocated buffer.
+
+    Each `recv_frames()` does one `recv_into()`, and returns the payloads of all complete
+    frames received so far as `memoryview`s into the buffer (no copy). They are only valid
+    until the next call, which moves the partial tail (if any) to the buffer head.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        *,
+        max_frame_size: int = MAX_FRAME_SIZE,
+        buffer: memoryview | None = None,
+    ) -> None:
+        """
+        :param `buffer`: preallocated buffer, e.g. from `BufferPool`.
+            At least `HEADER.size + max_frame_size` bytes.
+        """
+        self.sock = sock
+        self.max_frame_size = max_frame_size
+        if buffer is None:
+            buffer = memoryview(bytearray(max(BUFFER_SIZE, HEADER.size + max_frame_size)))
+        elif len(buffer) < HEADER.size + max_frame_size:
+            raise ValueError(f'buffer too small: {len(buffer)}')
+        self.view = buffer
+        self.start = 0  # first unparsed byte
+        self.end = 0  # end of received data
+
+    def recv_frames(self) -> list[memoryview] | None:
+        """Receive and parse frames. Return `None` at EOF.
+
+        :raise `ValueError`: a frame exceeds `max_frame_size`.
+        """
+        if self.start:
+            # move the partial tail to the head (memmove)
+            size = self.end - self.start
+            self.view[:size] = self.view[self.start : self.end]
+            self.start, self.end = 0, size
+
+        n = self.sock.recv_into(self.view[self.end :])
+        if not n:
+            if self.end:
+                logger.warning(f'connection closed with partial frame: {self.end} bytes')
+            return None
+        self.end += n
+
+        frames: list[memoryview] = []
+        while self.end - self.start >= HEADER.size:
+            (length,) = HEADER.unpack_from(self.view, self.start)
+            if length > self.max_frame_size:
+                raise ValueError(f'frame too large: {length} > {self.max_frame_size}')
+            frame_end = self.start + HEADER.size + length
+            if frame_end > self.end:
+                break  # partial frame, wait for more data
+            frames.append(self.view[self.start + HEADER.size : frame_end])
+            self.start = frame_end
+
+        if self.start == self.end:
+            self.start = self.end = 0
+        return frames
+
+
+class RecordReader:
+    """Parse fixed-size records from a stream socket, in batches.
+
+    Each `recv_records()` does one `recv_into()` into a preallocated buffer, and unpacks
+    all complete records received so far, in place (`Struct.iter_unpack()` over a
+    `memoryview` of the buffer: no slicing copy). The partial tail (less than one record)
+    is moved to the buffer head for the next call.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        record: struct.Struct,
+        *,
+        buffer: memoryview | None = None,
+    ) -> None:
+        """
+        :param `buffer`: preallocated buffer, e.g. from `BufferPool`.
+            At least `record.size` bytes, ideally many records large.
+        """
+        self.sock = sock
+        self.record = record
+        if buffer is None:
+            buffer = memoryview(bytearray(max(BUFFER_SIZE, record.size)))
+        elif len(buffer) < record.size:
+            raise ValueError(f'buffer too small: {len(buffer)}')
+        self.view = buffer
+        self.end = 0  # end of received data (the partial tail, after parsing)
+
+    def recv_records(self) -> list[tuple[Any, ...]] | None:
+        """Receive and unpack records. Return `None` at EOF."""
+        n = self.sock.recv_into(self.view[self.end :])
+        if not n:
+            if self.end:
+                logger.warning(f'connection closed with partial record: {self.end} bytes')
+            return None
+        self.end += n
+
+        size = self.end - self.end % self.record.size  # complete records
+        records = list(self.record.iter_unpack(self.view[:size]))
+        if size:
+            # move the partial tail to the head (memmove, less than one record)
+            self.view[: self.end - size] = self.view[size : self.end]
+            self.end -= size
+        return records
+
+    def __iter__(self) -> Iterator[list[tuple[Any, ...]]]:
+        """Yield batches of records until EOF."""
+        while (records := self.recv_records()) is not None:
+            if records:
+                yield records
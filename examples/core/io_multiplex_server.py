@@ -1,9 +1,25 @@
 """I/O Multiplex (Server)"""
 
+from __future__ import annotations
+
 import logging
+import select
 import selectors
+import signal
 import socket
-from typing import NoReturn
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable
+from contextlib import suppress
+from functools import partial
+from typing import Literal
+
+from examples.core.buffer_pool import buffer_pool
+from examples.core.fd_handoff import Balance, WorkerChannel, run_pool
+from examples.core.prefork import Prefork
+from examples.core.timer_wheel import TimerWheel
 
 logging.basicConfig(level=logging.DEBUG, style='{', format='[{processName} ({process})] {message}')
 
@@ -16,33 +32,252 @@ logging.basicConfig(level=logging.DEBUG, style='{', format='[{processName} ({pro
 # @see select
 selector = selectors.DefaultSelector()
 
+# The event loop is single-threaded, so one buffer is shared by all connections.
+recv_buffer = buffer_pool.acquire()
 
-def handle_read(conn: socket.socket, mask: int) -> None:
-    """Callback for read events."""
-    assert mask == selectors.EVENT_READ
+# outbound queue size (per connection) to pause/resume reading
+HIGH_WATERMARK = 64 * 1024
+LOW_WATERMARK = 16 * 1024
 
-    try:
-        client_address = conn.getpeername()
+# idle timeout: granularity of the timer wheel (seconds)
+IDLE_TICK = 1.0
+
+# a leaving reactor serves its open connections up to this many seconds
+DRAIN_TIMEOUT = 30.0
+
+type Backend = Literal['selectors', 'epoll']
+EPOLLEXCLUSIVE: int = getattr(select, 'EPOLLEXCLUSIVE', 0)  # Linux 4.5+
+
+
+class BufferedConnection(ABC):
+    """Per-connection state, with an outbound queue.
+
+    A non-blocking `send()` only copies what fits in the kernel send buffer; the rest is
+    queued, and flushed when the socket becomes writable (`selectors.EVENT_WRITE`).
+    `sendall()` would raise `BlockingIOError` (or busy-loop) instead.
+
+    Backpressure: when the outbound queue exceeds `HIGH_WATERMARK`, stop reading from
+    this (slow) peer until the queue drains below `LOW_WATERMARK`, so that one slow
+    consumer can neither grow memory unboundedly nor stall other clients on the loop.
 
-        data = conn.recv(1024)
-        if data:
-            logging.debug(f'recv: {data!r}, from {client_address}')
-            conn.sendall(data)
-            logging.debug(f'sent: {data!r}')
+    Idle timeout: each read (or flushed write) touches the connection in the timer wheel
+    `idle`, and the event loop closes the connections expired from it.
+
+    Subclasses register the connection to an event loop.
+    """
+
+    def __init__(
+        self,
+        conn: socket.socket,
+        *,
+        on_close: Callable[[BufferedConnection], object] | None = None,
+        idle: TimerWheel[BufferedConnection] | None = None,
+    ) -> None:
+        self.conn = conn
+        self.on_close = on_close
+        self.idle = idle
+        self.client_address = conn.getpeername()
+        self.outbound: deque[bytes | memoryview] = deque()
+        self.outbound_size = 0
+        self.reading = True
+        self.closing = False  # close after flushed
+        if idle is not None:
+            idle.touch(self)
+
+    def read(self) -> None:
+        # zero-copy: receive into the shared buffer, instead of a new `bytes` per `recv()`
+        size = self.conn.recv_into(recv_buffer)
+        if size:
+            logging.debug(f'recv: {size} bytes, from {self.client_address}')
+            if self.idle is not None:
+                self.idle.touch(self)
+            self.write(recv_buffer[:size])
         else:
-            logging.debug(f'no data from {client_address}')
-            selector.unregister(conn)
+            logging.debug(f'no data from {self.client_address}')
+            self.reading = False
+            self.closing = True
+
+    def write(self, data: memoryview) -> None:
+        if not self.outbound:
+            # fast path: send directly
+            try:
+                sent = self.conn.send(data)
+            except BlockingIOError:
+                sent = 0
+            logging.debug(f'sent: {sent} bytes')
+            if sent == len(data):
+                return
+            data = data[sent:]
+
+        # copy out of the shared buffer
+        self.outbound.append(data.tobytes())
+        self.outbound_size += len(data)
+        if self.reading and self.outbound_size > HIGH_WATERMARK:
+            logging.debug(f'pause reading from {self.client_address}: {self.outbound_size}')
+            self.reading = False
+
+    def flush(self) -> None:
+        while self.outbound:
+            data = self.outbound[0]
+            try:
+                sent = self.conn.send(data)
+            except BlockingIOError:
+                break
+            logging.debug(f'sent: {sent} bytes')
+            self.outbound_size -= sent
+            if self.idle is not None:
+                self.idle.touch(self)  # a slow reader is not idle
+            if sent < len(data):
+                self.outbound[0] = memoryview(data)[sent:]
+                break
+            self.outbound.popleft()
+
+        if not self.reading and not self.closing and self.outbound_size <= LOW_WATERMARK:
+            logging.debug(f'resume reading from {self.client_address}: {self.outbound_size}')
+            self.reading = True
+
+    @abstractmethod
+    def unregister(self) -> None:
+        """Remove the connection from its event loop."""
+
+    def close(self) -> None:
+        self.unregister()
+        if self.idle is not None:
+            self.idle.remove(self)
+
+        # explicitly shutdown.
+        # `socket.close()` merely releases the socket
+        # and waits for GC to perform the actual close.
+        with suppress(OSError):
+            self.conn.shutdown(socket.SHUT_WR)
+        self.conn.close()
+
+        if self.on_close is not None:
+            self.on_close(self)
+
+
+class Connection(BufferedConnection):
+    """Connection registered to a (level-triggered) selector."""
+
+    def __init__(
+        self,
+        conn: socket.socket,
+        selector: selectors.BaseSelector,
+        *,
+        on_close: Callable[[BufferedConnection], object] | None = None,
+        idle: TimerWheel[BufferedConnection] | None = None,
+    ) -> None:
+        super().__init__(conn, on_close=on_close, idle=idle)
+        self.selector = selector
+        self.events = selectors.EVENT_READ
+
+    def handle(self, conn: socket.socket, mask: int) -> None:
+        """Callback for read/write events."""
+        try:
+            if mask & selectors.EVENT_WRITE:
+                self.flush()
+            if mask & selectors.EVENT_READ and self.reading:
+                self.read()
+            self.update_events()
+        except OSError as err:
+            logging.error(f'{self.client_address}: {err}')
+            self.close()
+
+    def update_events(self) -> None:
+        """Toggle interest in read/write events."""
+        if self.closing and not self.outbound:
+            self.close()
+            return
+
+        events = (selectors.EVENT_READ if self.reading else 0) | (
+            selectors.EVENT_WRITE if self.outbound else 0
+        )
+        if events != self.events:
+            self.selector.modify(self.conn, events, self.handle)
+            self.events = events
+
+    def unregister(self) -> None:
+        self.selector.unregister(self.conn)
+
+
+class EdgeTriggeredConnection(BufferedConnection):
+    """Connection registered to `epoll` in edge-triggered mode (`EPOLLET`, Linux only).
+
+    Level-triggered `epoll` re-reports a socket on every `poll()` while it is readable
+    (writable). Edge-triggered `epoll` reports it only once per state change, so:
+
+    - read until `BlockingIOError`, otherwise the rest is never reported again;
+    - the interest (`EPOLLIN | EPOLLOUT`) is registered once, no `epoll_ctl()` per
+      toggle as `selector.modify()`.
+    """
+
+    def __init__(
+        self,
+        conn: socket.socket,
+        epoll: select.epoll,
+        *,
+        on_close: Callable[[BufferedConnection], object] | None = None,
+        idle: TimerWheel[BufferedConnection] | None = None,
+    ) -> None:
+        super().__init__(conn, on_close=on_close, idle=idle)
+        self.epoll = epoll
+        self.fd = conn.fileno()
+
+    def handle(self, event: int) -> None:
+        """Callback for `epoll` events."""
+        try:
+            was_reading = self.reading
+            if event & select.EPOLLOUT:
+                self.flush()
+
+            # Resumed reading: no new edge for data pending since paused.
+            if self.reading and (event & ~select.EPOLLOUT or not was_reading):
+                self.drain()
+
+            if self.closing and not self.outbound:
+                self.close()
+        except OSError as err:
+            logging.error(f'{self.client_address}: {err}')
+            self.close()
+
+    def drain(self) -> None:
+        while self.reading:
+            try:
+                self.read()
+            except BlockingIOError:
+                break
+
+    def unregister(self) -> None:
+        self.epoll.unregister(self.fd)
+
+
+def new_idle_wheel(idle_timeout: float | None) -> TimerWheel[BufferedConnection] | None:
+    if idle_timeout is None:
+        return None
+    return TimerWheel(idle_timeout, min(IDLE_TICK, idle_timeout))
 
-            # explicitly shutdown.
-            # `socket.close()` merely releases the socket
-            # and waits for GC to perform the actual close.
-            conn.shutdown(socket.SHUT_WR)
-            conn.close()
-    except OSError as err:
-        logging.error(err)
 
+def select_timeout(
+    timeout: float | None, idle: TimerWheel[BufferedConnection] | None
+) -> float | None:
+    """Wake up at least once per tick of the timer wheel."""
+    if idle is None:
+        return timeout
+    return idle.tick if timeout is None else min(timeout, idle.tick)
 
-def handle_requests(sock: socket.socket, mask: int) -> None:
+
+def close_idle(idle: TimerWheel[BufferedConnection] | None) -> None:
+    """Close connections expired from the timer wheel: O(expired), not O(connections)."""
+    if idle is None:
+        return
+    for connection in idle.advance():
+        logging.debug(f'close idle connection {connection.client_address}')
+        connection.close()
+
+
+def handle_requests(
+    sock: socket.socket, mask: int, idle: TimerWheel[BufferedConnection] | None = None
+) -> None:
     """Callback for new connections."""
     assert mask == selectors.EVENT_READ
 
@@ -51,7 +286,186 @@ def handle_requests(sock: socket.socket, mask: int) -> None:
     logging.debug(f'recv request from {client_address}')
 
     conn.setblocking(False)
-    selector.register(conn, selectors.EVENT_READ, handle_read)
+    connection = Connection(conn, selector, idle=idle)
+    selector.register(conn, connection.events, connection.handle)
+
+
+class Reactor:
+    """Event loop of one worker process, in multi-reactor mode.
+
+    Connections accepted by the acceptor process are passed in as file descriptors over
+    a Unix domain socket (`SCM_RIGHTS`, see `fd_handoff`). The current number of
+    connections is reported back after each change, for least-loaded balancing.
+
+    Leaving (e.g. on `SIGTERM`), it reports `DRAINING` (no more connections), and keeps
+    serving its open connections until they are closed (by the clients, or when idle),
+    up to `drain_timeout` seconds; only then the remaining ones are closed.
+    """
+
+    def __init__(
+        self,
+        channel: WorkerChannel,
+        *,
+        idle_timeout: float | None = None,
+        drain_timeout: float = DRAIN_TIMEOUT,
+    ) -> None:
+        self.channel = channel
+        # one epoll instance per process: never share it across `fork()`
+        self.selector = selectors.DefaultSelector()
+        self.connections: set[BufferedConnection] = set()
+        self.idle = new_idle_wheel(idle_timeout)
+        self.drain_timeout = drain_timeout
+        self.draining = False
+
+    def handle_fds(self, channel: WorkerChannel, mask: int) -> None:
+        """Callback for connections passed in by the acceptor."""
+        try:
+            conns = channel.recv_connections()
+        except EOFError as err:
+            raise SystemExit(str(err)) from err
+
+        for conn in conns:
+            conn.setblocking(False)
+            logging.debug(f'recv connection from {conn.getpeername()}')
+
+            connection = Connection(conn, self.selector, on_close=self.remove, idle=self.idle)
+            self.selector.register(conn, connection.events, connection.handle)
+            self.connections.add(connection)
+        self.report_load()
+
+    def remove(self, connection: BufferedConnection) -> None:
+        self.connections.discard(connection)
+        self.report_load()
+
+    def report_load(self) -> None:
+        if not self.draining:  # keep `DRAINING` until gone
+            self.channel.report_load(len(self.connections))
+
+    def run(self, timeout: float | None = None) -> None:
+        self.selector.register(self.channel, selectors.EVENT_READ, self.handle_fds)
+        self.report_load()
+        try:
+            while True:
+                for key, mask in self.selector.select(select_timeout(timeout, self.idle)):
+                    callback = key.data
+                    callback(key.fileobj, mask)
+                close_idle(self.idle)
+        finally:
+            # no more connections for this reactor, then drain and close its own
+            self.draining = True
+            with suppress(OSError):
+                self.channel.report_draining()
+            self.selector.unregister(self.channel)
+            try:
+                self.drain()
+            finally:
+                for connection in list(self.connections):
+                    connection.on_close = None
+                    connection.close()
+                self.selector.close()
+
+    def drain(self) -> None:
+        """Serve the open connections until all closed, or `drain_timeout` expires."""
+        deadline = time.monotonic() + self.drain_timeout
+        while self.connections and (remaining := deadline - time.monotonic()) > 0:
+            for key, mask in self.selector.select(select_timeout(remaining, self.idle)):
+                callback = key.data
+                callback(key.fileobj, mask)
+            close_idle(self.idle)
+        if self.connections:
+            logging.warning(f'drain timed out, closing {len(self.connections)} connections')
+
+
+class EpollServer:
+    """Event loop on edge-triggered `epoll` (Linux only).
+
+    The listener is registered with `EPOLLEXCLUSIVE` (Linux 4.5+): when several processes
+    wait on the same (inherited) listener with their own `epoll` instances, only one of
+    them is woken up per new connection, instead of all (thundering herd).
+    """
+
+    def __init__(
+        self, sock: socket.socket, *, max_events: int = -1, idle_timeout: float | None = None
+    ) -> None:
+        self.sock = sock
+        self.max_events = max_events
+        self.epoll = select.epoll()
+        self.connections: dict[int, EdgeTriggeredConnection] = {}
+        self.idle = new_idle_wheel(idle_timeout)
+
+    def accept(self) -> None:
+        """Accept all pending connections (edge-triggered) in one wakeup."""
+        while True:
+            try:
+                # `accept4(SOCK_CLOEXEC)` on Linux
+                conn, client_address = self.sock.accept()
+            except BlockingIOError:
+                break
+            logging.debug(f'recv request from {client_address}')
+
+            conn.setblocking(False)
+            connection = EdgeTriggeredConnection(
+                conn, self.epoll, on_close=self.remove, idle=self.idle
+            )
+            self.connections[connection.fd] = connection
+            # reported at once if already readable (data arrived before registered)
+            self.epoll.register(
+                connection.fd,
+                select.EPOLLIN | select.EPOLLOUT | select.EPOLLRDHUP | select.EPOLLET,
+            )
+
+    def remove(self, connection: BufferedConnection) -> None:
+        assert isinstance(connection, EdgeTriggeredConnection)
+        self.connections.pop(connection.fd, None)
+
+    def run(self, timeout: float | None = None) -> None:
+        listener_fd = self.sock.fileno()
+        self.epoll.register(listener_fd, select.EPOLLIN | select.EPOLLET | EPOLLEXCLUSIVE)
+        timeout = select_timeout(timeout, self.idle)
+        try:
+            while True:
+                for fd, event in self.epoll.poll(
+                    -1 if timeout is None else timeout, self.max_events
+                ):
+                    if fd == listener_fd:
+                        self.accept()
+                    elif connection := self.connections.get(fd):
+                        connection.handle(event)
+                close_idle(self.idle)
+        finally:
+            for connection in list(self.connections.values()):
+                connection.close()
+            self.epoll.close()
+
+
+def exit_on_sigterm() -> None:
+    """Leave the event loop (through `finally`) and exit on `SIGTERM`, in workers."""
+    signal.signal(signal.SIGTERM, lambda _signum, _frame: sys.exit(0))
+
+
+def run_epoll_worker(
+    sock: socket.socket, timeout: float | None = None, idle_timeout: float | None = None
+) -> None:
+    exit_on_sigterm()
+    EpollServer(sock, idle_timeout=idle_timeout).run(timeout)
+
+
+def run_multi_reactor(
+    sock: socket.socket,
+    workers: int,
+    *,
+    balance: Balance = 'round_robin',
+    timeout: float | None = None,
+    idle_timeout: float | None = None,
+    drain_timeout: float = DRAIN_TIMEOUT,
+) -> None:
+    """Run one acceptor process and `workers` reactor processes (see `fd_handoff`)."""
+
+    def serve(channel: WorkerChannel) -> None:
+        exit_on_sigterm()
+        Reactor(channel, idle_timeout=idle_timeout, drain_timeout=drain_timeout).run(timeout)
+
+    run_pool(sock, workers, serve, balance=balance, timeout=timeout)
 
 
 def run_server(
@@ -60,20 +474,61 @@ def run_server(
     *,
     accept_queue_size: int = socket.SOMAXCONN,
     timeout: float | None = None,
-) -> NoReturn:
+    idle_timeout: float | None = None,
+    workers: int = 0,
+    balance: Balance = 'round_robin',
+    backend: Backend = 'selectors',
+) -> None:
+    """Run server.
+
+    :param `idle_timeout`: close connections without any activity for this many seconds,
+        long before the TCP keep-alive probes (`TCP_KEEPIDLE`) do. `None` to disable.
+    :param `workers`: number of worker processes (POSIX only).
+        `0` to run a single event loop in this process.
+    :param `balance`: how the acceptor distributes connections to reactors.
+        `'round_robin'` or `'least_loaded'`.
+    :param `backend`:
+        - `'selectors'`: `selectors.DefaultSelector` (level-triggered). With `workers`,
+          one acceptor process passes connections to reactor processes.
+        - `'epoll'`: edge-triggered `epoll` (Linux only). With `workers`, each process
+          waits on the shared listener with `EPOLLEXCLUSIVE`.
+    """
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     sock.setblocking(False)
     sock.bind((host, port))
     sock.listen(accept_queue_size)
 
-    selector.register(sock, selectors.EVENT_READ, handle_requests)
+    if backend == 'epoll':
+        try:
+            if workers > 0:
+                Prefork(
+                    lambda _worker_id: run_epoll_worker(sock, timeout, idle_timeout), workers
+                ).run()
+            else:
+                EpollServer(sock, idle_timeout=idle_timeout).run(timeout)
+        finally:
+            sock.close()
+        return
+
+    if workers > 0:
+        try:
+            run_multi_reactor(
+                sock, workers, balance=balance, timeout=timeout, idle_timeout=idle_timeout
+            )
+        finally:
+            sock.close()
+        return
+
+    idle = new_idle_wheel(idle_timeout)
+    selector.register(sock, selectors.EVENT_READ, partial(handle_requests, idle=idle))
 
     # Accept and handle incoming client requests
     try:
         while True:
-            for key, mask in selector.select(timeout):
+            for key, mask in selector.select(select_timeout(timeout, idle)):
                 callback = key.data
                 callback(key.fileobj, mask)
+            close_idle(idle)
     finally:
         sock.close()
         selector.close()
@@ -89,4 +544,8 @@ if __name__ == '__main__':
         'localhost',
         9999,
         timeout=5.5,
+        idle_timeout=300.0,
+        workers=0,  # e.g. `os.cpu_count()` for multi-reactor mode
+        balance='round_robin',
+        backend='selectors',  # 'epoll' for edge-triggered `epoll` (Linux)
     )
@@ -0,0 +1,307 @@
+"""IPC - Shared Memory Ring Buffer (SPSC, 共享内存环形缓冲区)
+
+A `socketpair()` copies the data twice (into the kernel, then out of it), in chunks of
+the socket buffer size, with (at least) two system calls per chunk. `ShmRing` puts the
+data in a `multiprocessing.shared_memory` ring instead: one copy in, none out (read in
+place), and no system call at all while neither side has to wait.
+
+Single producer, single consumer: the producer only moves `head`, the consumer only
+moves `tail` (byte counters, ring offset = counter % capacity), each in its own cache line.
+A message is a 4-byte length and the payload, always contiguous (the end of the ring is
+skipped if too short), so that the consumer can read it in place (`peek()`).
+
+The `socketpair()` only carries wakeups: a side about to block on an empty (or full)
+ring sets its `waiting` flag, and the other side sends one byte only when the flag is
+set (and clears it: one wakeup per wait). The flags and the counters are plain memory
+accesses, not atomic operations: a wakeup missed in a race is recovered by the wait
+timeout (`WAKEUP_TIMEOUT`).
+
+**NOTE**: relies on aligned 8-byte stores being atomic (x86-64, ARM64).
+
+Benchmark (MB/s and round-trip latency, vs. `socketpair()`):
+
+    python -m examples.core.ipc_shm_ring
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import selectors
+import socket
+import struct
+import time
+from collections.abc import Callable
+from contextlib import suppress
+from multiprocessing.shared_memory import SharedMemory
+
+from examples.core.framing import recv_frame, send_frame
+
+logger = logging.getLogger()
+
+RING_CAPACITY = 8 * 1024 * 1024
+WAKEUP_TIMEOUT = 0.01  # seconds
+
+_U64 = struct.Struct('=Q')
+LENGTH = struct.Struct('=I')
+PAD = 0xFFFFFFFF  # length of the padding to the end of the ring
+
+# shared header: one cache line (64 bytes) per writer
+_HEAD = 0  # written by the producer
+_PRODUCER_WAITING = 8
+_TAIL = 64  # written by the consumer
+_CONSUMER_WAITING = 72
+_DATA = 128
+
+
+class ShmRing:
+    """Single-producer/single-consumer message ring in shared memory.
+
+    Create it before `fork()`; then one process only calls `send()`, the other only
+    `peek()` and `advance()` (or `recv()`). The creator calls `unlink()` when both are done.
+    """
+
+    def __init__(self, capacity: int = RING_CAPACITY) -> None:
+        self.capacity = capacity
+        self.shm = SharedMemory(create=True, size=_DATA + capacity)
+        buf = self.shm.buf
+        assert buf is not None
+        self.buf = buf
+        self.buf[:_DATA] = bytes(_DATA)
+        self.data = self.buf[_DATA : _DATA + capacity]
+
+        # wakeups: producer -> consumer on `_consumer_sock`, consumer -> producer on
+        # `_producer_sock`
+        self._producer_sock, self._consumer_sock = socket.socketpair()
+        for sock in (self._producer_sock, self._consumer_sock):
+            sock.setblocking(False)
+        self._selector: selectors.BaseSelector | None = None
+
+        self._head = 0  # local copy, in the producer
+        self._tail = 0  # local copy, in the consumer
+        self._next_tail = 0
+
+    def close(self) -> None:
+        if self._selector is not None:
+            self._selector.close()
+        self._producer_sock.close()
+        self._consumer_sock.close()
+        self.data.release()
+        self.buf.release()
+        self.shm.close()
+
+    def unlink(self) -> None:
+        self.shm.unlink()
+
+    def _load(self, offset: int) -> int:
+        return _U64.unpack_from(self.buf, offset)[0]
+
+    def _store(self, offset: int, value: int) -> None:
+        _U64.pack_into(self.buf, offset, value)
+
+    def _wait(self, sock: socket.socket, flag: int, ready: Callable[[], bool]) -> None:
+        """Block until `ready()`, asking for a wakeup by `flag`."""
+        if self._selector is None:
+            # lazily, in the process using the ring (after `fork()`)
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(sock, selectors.EVENT_READ)
+        while True:
+            self._store(flag, 1)
+            if ready():  # re-check after setting the flag
+                self._store(flag, 0)
+                return
+            if self._selector.select(WAKEUP_TIMEOUT):
+                with suppress(BlockingIOError):
+                    sock.recv(4096)  # wakeups coalesced
+
+    def _notify(self, sock: socket.socket, flag: int) -> None:
+        """Wake up the other side, if it waits (one wakeup per wait)."""
+        if self._load(flag):
+            self._store(flag, 0)
+            # A full socket buffer means a wakeup is pending already.
+            with suppress(BlockingIOError):
+                sock.send(b'\0')
+
+    def send(self, payload: bytes | bytearray | memoryview) -> None:
+        """Append one message, waiting while the ring is full (producer only).
+
+        :raise `ValueError`: message larger than half the ring.
+        """
+        size = LENGTH.size + len(payload)
+        if size > self.capacity // 2:
+            raise ValueError(f'message too large: {size} > {self.capacity // 2}')
+
+        # A message is contiguous: skip the end of the ring if too short for it.
+        start = self._head % self.capacity
+        pad = self.capacity - start if self.capacity - start < size else 0
+        need = pad + size
+        if self.capacity - (self._head - self._load(_TAIL)) < need:
+            self._wait(
+                self._producer_sock,
+                _PRODUCER_WAITING,
+                lambda: self.capacity - (self._head - self._load(_TAIL)) >= need,
+            )
+
+        if pad:
+            if pad >= LENGTH.size:
+                LENGTH.pack_into(self.data, start, PAD)
+            start = 0
+        LENGTH.pack_into(self.data, start, len(payload))
+        self.data[start + LENGTH.size : start + size] = payload
+        self._head += need
+        self._store(_HEAD, self._head)  # publish, after the data
+        self._notify(self._producer_sock, _CONSUMER_WAITING)
+
+    def peek(self) -> memoryview:
+        """Wait for the next message, and return its payload in place (consumer only).
+
+        Zero-copy: the view is only valid until `advance()`, which frees its room.
+        """
+        if self._load(_HEAD) == self._tail:
+            self._wait(
+                self._consumer_sock,
+                _CONSUMER_WAITING,
+                lambda: self._load(_HEAD) != self._tail,
+            )
+
+        start = self._tail % self.capacity
+        pad = 0
+        if self.capacity - start < LENGTH.size or LENGTH.unpack_from(self.data, start)[0] == PAD:
+            pad, start = self.capacity - start, 0
+        (length,) = LENGTH.unpack_from(self.data, start)
+        self._next_tail = self._tail + pad + LENGTH.size + length
+        return self.data[start + LENGTH.size : start + LENGTH.size + length]
+
+    def advance(self) -> None:
+        """Release the message returned by `peek()` (consumer only)."""
+        self._tail = self._next_tail
+        self._store(_TAIL, self._tail)  # free the room, after the use
+        self._notify(self._consumer_sock, _PRODUCER_WAITING)
+
+    def recv(self) -> bytes:
+        """Pop one message (a copy), waiting while the ring is empty (consumer only)."""
+        payload = bytes(self.peek())
+        self.advance()
+        return payload
+
+
+# Benchmark
+
+_fork = multiprocessing.get_context('fork')
+
+
+def _shm_throughput(payload: bytes, count: int) -> float:
+    ring = ShmRing()
+
+    def consume() -> None:
+        for _ in range(count):
+            ring.peek()  # in place
+            ring.advance()
+
+    child = _fork.Process(target=consume)
+    start = time.perf_counter()
+    child.start()
+    for _ in range(count):
+        ring.send(payload)
+    child.join()
+    elapsed = time.perf_counter() - start
+    ring.close()
+    ring.unlink()
+    return elapsed
+
+
+def _socketpair_throughput(payload: bytes, count: int) -> float:
+    parent, child_sock = socket.socketpair()
+    max_size = len(payload)
+
+    def consume() -> None:
+        for _ in range(count):
+            recv_frame(child_sock, max_size)
+
+    child = _fork.Process(target=consume)
+    start = time.perf_counter()
+    child.start()
+    for _ in range(count):
+        send_frame(parent, payload)
+    child.join()
+    elapsed = time.perf_counter() - start
+    parent.close()
+    child_sock.close()
+    return elapsed
+
+
+def _shm_round_trips(payload: bytes, count: int) -> list[float]:
+    ping, pong = ShmRing(), ShmRing()
+
+    def echo() -> None:
+        for _ in range(count):
+            pong.send(ping.peek())
+            ping.advance()
+
+    child = _fork.Process(target=echo)
+    child.start()
+    rtts = []
+    for _ in range(count):
+        start = time.perf_counter()
+        ping.send(payload)
+        pong.peek()
+        pong.advance()
+        rtts.append(time.perf_counter() - start)
+    child.join()
+    for ring in (ping, pong):
+        ring.close()
+        ring.unlink()
+    return rtts
+
+
+def _socketpair_round_trips(payload: bytes, count: int) -> list[float]:
+    parent, child_sock = socket.socketpair()
+    max_size = len(payload)
+
+    def echo() -> None:
+        for _ in range(count):
+            send_frame(child_sock, recv_frame(child_sock, max_size))
+
+    child = _fork.Process(target=echo)
+    child.start()
+    rtts = []
+    for _ in range(count):
+        start = time.perf_counter()
+        send_frame(parent, payload)
+        recv_frame(parent, max_size)
+        rtts.append(time.perf_counter() - start)
+    child.join()
+    parent.close()
+    child_sock.close()
+    return rtts
+
+
+def benchmark(
+    *,
+    sizes: tuple[int, ...] = (4 * 1024, 64 * 1024, 1024 * 1024),
+    total: int = 256 * 1024 * 1024,
+    round_trips: int = 1000,
+) -> None:
+    """Throughput (MB/s) of `total` bytes one way, and round-trip latency (p50/p99, us),
+    for each payload size, between a parent and a forked child process.
+    """
+    for size in sizes:
+        payload = os.urandom(size)
+        count = total // size
+        for name, throughput, rtt in (
+            ('shm ring', _shm_throughput, _shm_round_trips),
+            ('socketpair', _socketpair_throughput, _socketpair_round_trips),
+        ):
+            mb_s = total / throughput(payload, count) / 1e6
+            rtts = sorted(rtt(payload, round_trips))
+            p50 = rtts[len(rtts) // 2] * 1e6
+            p99 = rtts[len(rtts) * 99 // 100] * 1e6
+            print(
+                f'{size // 1024:>5} KiB {name:>10}: {mb_s:8.0f} MB/s, '
+                f'RTT p50 {p50:8.1f} us, p99 {p99:8.1f} us'
+            )
+
+
+if __name__ == '__main__':
+    benchmark()
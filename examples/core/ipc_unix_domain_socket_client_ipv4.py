@@ -8,19 +8,20 @@ logging.basicConfig(level=logging.DEBUG, style='{', format='[{processName} ({pro
 SOCKFILE = 'xxx.sock'
 
 
-with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
-    try:
-        logging.debug('connecting ...')
-        client.connect(SOCKFILE)
-        logging.debug('connected')
+if __name__ == '__main__':
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            logging.debug('connecting ...')
+            client.connect(SOCKFILE)
+            logging.debug('connected')
 
-        data: bytes = b'data'
+            data: bytes = b'data'
 
-        client.sendall(data)
-        logging.debug(f'sent: {data!r}')
+            client.sendall(data)
+            logging.debug(f'sent: {data!r}')
 
-        data = client.recv(1024)
-        logging.debug(f'recv: {data!r}')
+            data = client.recv(1024)
+            logging.debug(f'recv: {data!r}')
 
-    except OSError as err:
-        logging.error(err)
+        except OSError as err:
+            logging.error(err)
@@ -5,38 +5,45 @@ import os
 import socket
 from contextlib import suppress
 
+from examples.core.buffer_pool import buffer_pool
+
 logging.basicConfig(level=logging.DEBUG, style='{', format='[{processName} ({process})] {message}')
 
 SOCKFILE = 'xxx.sock'
 
-# Make sure the socket does not already exist.
-with suppress(FileNotFoundError):
-    os.remove(SOCKFILE)
-
-sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-
-# bind
-sock.bind(SOCKFILE)
-sock.listen()
-
-try:
-    while True:
-        logging.debug('wait for request ...')
-        conn, client_address = sock.accept()
-        assert isinstance(conn, socket.socket)
-        assert client_address == ''
-
-        logging.debug('start to handle request ...')
-        with conn:
-            while True:
-                data: bytes = conn.recv(1024)
-                if data:
-                    logging.debug(f'recv: {data!r}')
-                    conn.sendall(data)
-                    logging.debug(f'sent: {data!r}')
-                else:
-                    logging.warning('no data recv')
-                    break
-        logging.debug('end handling request')
-finally:
-    sock.close()
+if __name__ == '__main__':
+    # Make sure the socket does not already exist.
+    with suppress(FileNotFoundError):
+        os.remove(SOCKFILE)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    # bind
+    sock.bind(SOCKFILE)
+    sock.listen()
+
+    # zero-copy: `recv_into()` a reused buffer
+    buf = buffer_pool.acquire()
+
+    try:
+        while True:
+            logging.debug('wait for request ...')
+            conn, client_address = sock.accept()
+            assert isinstance(conn, socket.socket)
+            assert client_address == ''
+
+            logging.debug('start to handle request ...')
+            with conn:
+                while True:
+                    size = conn.recv_into(buf)
+                    if size:
+                        logging.debug(f'recv: {size} bytes')
+                        conn.sendall(buf[:size])
+                        logging.debug(f'sent: {size} bytes')
+                    else:
+                        logging.warning('no data recv')
+                        break
+            logging.debug('end handling request')
+    finally:
+        buffer_pool.release(buf)
+        sock.close()
@@ -9,6 +9,9 @@ import socket
 import struct
 from pathlib import Path
 
+from examples.core.multicast_receiver import autosize_recv_buffer, read_rmem_max
+from examples.core.udp_batch import create_batch
+
 logging.basicConfig(level=logging.DEBUG, style='{', format='[{processName} ({process})] {message}')
 logger: logging.Logger = logging.getLogger()
 
@@ -28,7 +31,7 @@ if os_name == 'Linux':
     # Get max UDP recv/send buffer size in system (Linux)
     # - read(recv): /proc/sys/net/core/rmem_max
     # - write(send): /proc/sys/net/core/wmem_max
-    max_recv_buf_size = int(Path('/proc/sys/net/core/rmem_max').read_text(encoding='utf-8').strip())
+    max_recv_buf_size = read_rmem_max()
     max_send_buf_size = int(Path('/proc/sys/net/core/wmem_max').read_text(encoding='utf-8').strip())
 else:
     max_recv_buf_size = max_send_buf_size = None  # pylint: disable=invalid-name
@@ -44,7 +47,7 @@ def run_server(
     multicast_loopback: bool | None = None,
 ) -> None:
     """Run server."""
-    sock: socket.SocketType = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
     # Reuse address
     #
@@ -58,12 +61,10 @@ def run_server(
     logger.debug(f'Server address: {server_address}')
 
     # Set recv/send buffer size
-    if recv_buf_size:
-        # kernel do this already!
-        # if max_recv_buf_size:
-        #    recv_buf_size = min(recv_buf_size, max_recv_buf_size)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, recv_buf_size)
-    recv_buf_size = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+    #
+    # Default recv buffer size: `rmem_max`, to absorb multicast bursts (the kernel
+    # drops the datagrams overflowing the socket queue).
+    recv_buf_size = autosize_recv_buffer(sock, recv_buf_size)
     logger.debug(f'Server recv buffer size: {recv_buf_size} (max={max_recv_buf_size})')
     if send_buf_size:
         # kernel do this already!
@@ -96,18 +97,27 @@ def run_server(
     multicast_loopback = sock.getsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP) == 1
     logger.debug(f'Server multicast loopback enabled: {multicast_loopback}')
 
+    # Drain the datagrams of a multicast burst per wakeup, and echo them back in bulk
+    # (`recvmmsg()`/`sendmmsg()` on Linux).
+    batch = create_batch(sock)
+
     # Accept and handle incoming client requests
     try:
         while True:
-            data, client_address = sock.recvfrom(1024)
-            if data:
-                logger.debug(f'recv: {data!r}, from: {client_address}')
-                sock.sendto(data, client_address)
-                logger.debug(f'sent: {data!r}, to: {client_address}')
-            else:
-                logger.debug(f'no data from {client_address}')
+            count = batch.recv()
+            logger.debug(f'recv: {count} datagrams')
+
+            if 0 in batch.sizes[:count]:
+                i = batch.sizes.index(0)
+                logger.debug(f'no data from {batch.address(i)}')
+                batch.send(i)  # reply to the previous ones only
                 break
+
+            batch.send()  # echo
+            logger.debug(f'sent: {count} datagrams')
     finally:
+        batch.close()
+
         # Leave group
         #
         # The `IP_DROP_MEMBERSHIP` socket option
@@ -122,7 +132,8 @@ def run_server(
         sock.close()
 
 
-# host '' or '0.0.0.0': socket.INADDR_ANY
-# Port 0 means to select an arbitrary unused port
-# IPv4 mulicast range from `224.0.0.0` to `239.255.255.255` (D class).
-run_server('224.3.29.71', 9999)
+if __name__ == '__main__':
+    # host '' or '0.0.0.0': socket.INADDR_ANY
+    # Port 0 means to select an arbitrary unused port
+    # IPv4 mulicast range from `224.0.0.0` to `239.255.255.255` (D class).
+    run_server('224.3.29.71', 9999)
@@ -0,0 +1,259 @@
+"""Sharded Multicast Receiver (组播接收, 分片)
+
+Market-data style feeds publish on many multicast groups, in bursts. One socket joined to
+all the groups, with the default receive buffer (`rmem_default`, ~208 KiB), overflows:
+the kernel drops the datagrams that do not fit in the socket queue, silently.
+
+- one socket per group, bound to the group address (only its datagrams are delivered);
+- `SO_RCVBUF` auto-sized up to `/proc/sys/net/core/rmem_max`, or beyond with
+  `SO_RCVBUFFORCE` (`CAP_NET_ADMIN`);
+- kernel drops reported per socket, by `SO_RXQ_OVFL` (Linux 2.6.33+): the drop counter
+  of the socket, as of its enqueueing, comes with each datagram as ancillary data of
+  `recvmsg()` (so drops are reported with the next datagram received);
+- groups sharded over worker threads (`recvmsg_into()` releases the GIL) or processes,
+  each draining its sockets with one selector.
+
+    run_receivers([('224.3.29.71', 9999), ('224.3.29.72', 9999)], handler, workers=2)
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import multiprocessing.synchronize
+import selectors
+import socket
+import struct
+import sys
+import threading
+import time
+from collections.abc import Callable, Sequence
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger()
+
+# Not exported by the `socket` module (Linux values).
+SO_RCVBUFFORCE = getattr(socket, 'SO_RCVBUFFORCE', 33)
+SO_RXQ_OVFL = getattr(socket, 'SO_RXQ_OVFL', 40)
+IP_MULTICAST_ALL = getattr(socket, 'IP_MULTICAST_ALL', 49)
+
+BATCH_SIZE = 64  # max datagrams drained from one socket per wakeup (fairness)
+MAX_DATAGRAM_SIZE = 2048
+STATS_INTERVAL = 10.0  # seconds
+
+_DROPS = struct.Struct('=I')  # `SO_RXQ_OVFL`: uint32, cumulative drops of the socket
+_ANCBUF_SIZE = socket.CMSG_SPACE(_DROPS.size)
+
+type Group = tuple[str, int]  # (group address, port)
+type Handler = Callable[[Group, memoryview, tuple[str, int]], object]
+type StopEvent = threading.Event | multiprocessing.synchronize.Event
+
+
+def read_rmem_max() -> int | None:
+    """Max `SO_RCVBUF` settable without privilege (Linux), `None` elsewhere."""
+    try:
+        return int(Path('/proc/sys/net/core/rmem_max').read_text(encoding='utf-8').strip())
+    except OSError:
+        return None
+
+
+def autosize_recv_buffer(sock: socket.socket, size: int | None = None) -> int:
+    """Grow `SO_RCVBUF` to `size` (default: `rmem_max`), and return the effective size.
+
+    `SO_RCVBUF` is silently capped to `rmem_max`; with `CAP_NET_ADMIN`, `SO_RCVBUFFORCE`
+    goes beyond it. The kernel doubles the value (for its bookkeeping overhead).
+    """
+    if size is None:
+        size = read_rmem_max()
+    if size is not None:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, SO_RCVBUFFORCE, size)
+        except OSError:  # `EPERM`: no privilege
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+    return sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+
+def open_group_socket(
+    group: Group,
+    *,
+    interface: str = '0.0.0.0',
+    recv_buf_size: int | None = None,
+) -> socket.socket:
+    """Open a non-blocking socket receiving the datagrams of one multicast group."""
+    group_address, port = group
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        # Several sockets (of any worker, or other applications) on the same port.
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        # Bound to the group address (Linux), the socket gets the datagrams of this group
+        # only, not of the other groups on the same port.
+        if sys.platform == 'linux':
+            sock.bind((group_address, port))
+            # Not the datagrams of the groups joined by the other sockets either.
+            sock.setsockopt(socket.IPPROTO_IP, IP_MULTICAST_ALL, 0)
+        else:
+            sock.bind(('', port))
+
+        mreq = struct.pack('4s4s', socket.inet_aton(group_address), socket.inet_aton(interface))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+
+        recv_buf_size = autosize_recv_buffer(sock, recv_buf_size)
+        with suppress(OSError):  # Linux only
+            sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+        sock.setblocking(False)
+    except OSError:
+        sock.close()
+        raise
+
+    logger.debug(f'joined {group_address}:{port}, recv buffer size: {recv_buf_size}')
+    return sock
+
+
+@dataclass
+class GroupStats:
+    received: int = 0
+    bytes: int = 0
+    drops: int = 0  # by the kernel: socket queue overflow (`SO_RXQ_OVFL`)
+
+
+class MulticastReceiver:
+    """Receive the datagrams of `groups`, one socket each, in one thread.
+
+    `handler(group, payload, address)` is called for each datagram. `payload` is valid
+    until the handler returns (the receive buffer is reused): copy it to keep it.
+    """
+
+    def __init__(
+        self,
+        groups: Sequence[Group],
+        handler: Handler,
+        *,
+        interface: str = '0.0.0.0',
+        recv_buf_size: int | None = None,
+        batch_size: int = BATCH_SIZE,
+    ) -> None:
+        self.handler = handler
+        self.batch_size = batch_size
+        self.stats: dict[Group, GroupStats] = {}
+        self._buffer = bytearray(MAX_DATAGRAM_SIZE)
+        self._view = memoryview(self._buffer)
+        self._selector = selectors.DefaultSelector()
+        try:
+            for group in groups:
+                sock = open_group_socket(group, interface=interface, recv_buf_size=recv_buf_size)
+                self._selector.register(sock, selectors.EVENT_READ, group)
+                self.stats[group] = GroupStats()
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        for key in list(self._selector.get_map().values()):
+            self._selector.unregister(key.fileobj)
+            sock: socket.socket = key.fileobj  # type: ignore[assignment]
+            sock.close()
+        self._selector.close()
+
+    def _drain(self, sock: socket.socket, group: Group) -> None:
+        stats = self.stats[group]
+        for _ in range(self.batch_size):
+            try:
+                size, ancdata, _flags, address = sock.recvmsg_into([self._view], _ANCBUF_SIZE)
+            except BlockingIOError:
+                return
+            stats.received += 1
+            stats.bytes += size
+            for level, kind, data in ancdata:
+                if level == socket.SOL_SOCKET and kind == SO_RXQ_OVFL:
+                    (drops,) = _DROPS.unpack(data)
+                    if drops != stats.drops:
+                        logger.warning(
+                            f'{group[0]}:{group[1]}: {drops - stats.drops} datagrams '
+                            f'dropped by kernel (total: {drops})'
+                        )
+                        stats.drops = drops
+            self.handler(group, self._view[:size], address)
+
+    def run(self, stop: StopEvent | None = None, *, stats_interval: float = STATS_INTERVAL) -> None:
+        """Receive until `stop` is set (checked every `stats_interval` at least)."""
+        next_stats = time.monotonic() + stats_interval
+        while stop is None or not stop.is_set():
+            for key, _mask in self._selector.select(stats_interval):
+                self._drain(key.fileobj, key.data)  # type: ignore[arg-type]
+            if (now := time.monotonic()) >= next_stats:
+                logger.debug(f'stats: {self.stats}')
+                next_stats = now + stats_interval
+
+
+def shard_groups(groups: Sequence[Group], workers: int) -> list[list[Group]]:
+    """Split `groups` round-robin into (at most) `workers` non-empty shards."""
+    shards: list[list[Group]] = [[] for _ in range(min(workers, len(groups)))]
+    for i, group in enumerate(groups):
+        shards[i % len(shards)].append(group)
+    return shards
+
+
+def _run_shard(
+    groups: list[Group],
+    handler: Handler,
+    stop: StopEvent,
+    interface: str,
+    recv_buf_size: int | None,
+    stats_interval: float,
+) -> None:
+    receiver = MulticastReceiver(groups, handler, interface=interface, recv_buf_size=recv_buf_size)
+    try:
+        receiver.run(stop, stats_interval=stats_interval)
+    finally:
+        logger.debug(f'stats: {receiver.stats}')
+        receiver.close()
+
+
+def run_receivers(
+    groups: Sequence[Group],
+    handler: Handler,
+    *,
+    workers: int = 1,
+    processes: bool = False,
+    stop: StopEvent | None = None,
+    interface: str = '0.0.0.0',
+    recv_buf_size: int | None = None,
+    stats_interval: float = STATS_INTERVAL,
+) -> None:
+    """Shard `groups` over `workers` threads (or processes), until `stop` or Ctrl-C.
+
+    With `processes`, `handler` runs in the worker processes (so it must be picklable
+    on platforms without `fork`), and `stop` must be a `multiprocessing.Event`.
+    """
+    if stop is None:
+        stop = multiprocessing.Event() if processes else threading.Event()
+
+    runners: list[threading.Thread | multiprocessing.Process] = []
+    for shard in shard_groups(groups, workers):
+        args = (shard, handler, stop, interface, recv_buf_size, stats_interval)
+        if processes:
+            runners.append(multiprocessing.Process(target=_run_shard, args=args))
+        else:
+            runners.append(threading.Thread(target=_run_shard, args=args))
+    for runner in runners:
+        runner.start()
+
+    try:
+        for runner in runners:
+            runner.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for runner in runners:
+            runner.join()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG, style='{', format='[{threadName}] {message}')
+
+    def log_datagram(group: Group, payload: memoryview, address: tuple[str, int]) -> None:
+        logger.debug(f'{group[0]}: {len(payload)} bytes from {address}')
+
+    run_receivers([('224.3.29.71', 9999), ('224.3.29.72', 9999)], log_datagram, workers=2)
@@ -5,6 +5,8 @@ import binascii
 import ctypes
 import struct
 
+from examples.core.struct_schema import TAG, TELEMETRY, registry
+
 # I: unsigned int (4 bytes)
 # i: int (4 bytes)
 # L: unsigned long (4 bytes)
@@ -56,3 +58,11 @@ buf2 = array.array('b', b'\0' * s.size)
 s.pack_into(buf2, 0, *value)
 assert buf2.tobytes() == data
 assert s.unpack_from(buf2, 0) == value
+
+# schema registry: declared once, compiled (see `examples.core.struct_schema`)
+message = TELEMETRY(1, b'ab', 2, 3, 3, 2.5)
+assert TELEMETRY.struct.format == '!I 2s Q h h f'
+assert TELEMETRY.decode(TELEMETRY.encode(message)) == message
+tagged_data = registry.encode(message)  # type tag + body
+assert len(tagged_data) == TAG.size + TELEMETRY.size
+assert registry.decode(tagged_data) == message
@@ -0,0 +1,238 @@
+"""Prefork - Multi-Processes Supervisor (预派生多进程)
+
+Fork N worker processes, restart crashed (or hung) ones, and drain them on `SIGTERM`.
+
+Each worker typically binds its own listener with `SO_REUSEPORT` (Linux 3.9+), so the
+kernel load-balances `accept()` across all workers (and CPU cores).
+"""
+
+import logging
+import os
+import selectors
+import signal
+import socket
+import time
+from collections.abc import Callable
+from contextlib import suppress
+from types import FrameType
+from typing import Literal
+
+logger = logging.getLogger()
+
+
+class Prefork:
+    """Supervisor of prefork worker processes (POSIX only).
+
+    `target(worker_id)` runs in each child process. The child exits with status `0` when
+    `target` returns, and `1` when it raises. Crashed workers (non-zero exit status) are
+    restarted, unless the supervisor is shutting down. With `restart='always'`, workers
+    exiting normally are restarted too (e.g. replaced one by one, by `SIGTERM`).
+
+    `SIGTERM` or `SIGINT` received by the supervisor is forwarded to all workers as
+    `SIGTERM`, and `run()` returns after all of them exit. Workers ignore `SIGINT`
+    (sent to the whole process group by Ctrl-C), and should install their own `SIGTERM`
+    handler to drain gracefully.
+
+    Health checks (with `health_interval`): each worker gets one end of a socket pair as
+    `channel`, and must echo back every ping received on it. A worker silent for more than
+    `health_timeout` (e.g. a blocked event loop) is killed with `SIGKILL`, then restarted.
+    """
+
+    def __init__(
+        self,
+        target: Callable[[int], object],
+        workers: int | None = None,
+        *,
+        restart_delay: float = 1.0,
+        restart: Literal['on-failure', 'always'] = 'on-failure',
+        health_interval: float | None = None,
+        health_timeout: float | None = None,
+    ) -> None:
+        self.target = target
+        self.workers = workers or os.cpu_count() or 1
+        self.restart_delay = restart_delay  # throttle crash loops
+        self.restart = restart
+        self.health_interval = health_interval
+        if health_timeout is None and health_interval is not None:
+            health_timeout = 3 * health_interval
+        self.health_timeout = health_timeout
+
+        # In a worker process (with health checks): its end of the health channel.
+        self.channel: socket.socket | None = None
+
+        self._children: dict[int, int] = {}  # pid -> worker id
+        self._channels: dict[int, socket.socket] = {}  # pid -> supervisor end
+        self._last_seen: dict[int, float] = {}  # pid -> time of last pong
+        self._restart_at: dict[int, float] = {}  # worker id -> time to restart (crashed)
+        self._selector = selectors.DefaultSelector()
+        self._wakeup = socket.socketpair()
+        self._stopping = False
+
+    def _spawn(self, worker_id: int) -> None:
+        pair = socket.socketpair() if self.health_interval is not None else None
+        pid = os.fork()
+        if pid:
+            # parent process
+            self._children[pid] = worker_id
+            if pair is not None:
+                channel, child_channel = pair
+                child_channel.close()
+                channel.setblocking(False)
+                self._channels[pid] = channel
+                self._last_seen[pid] = time.monotonic()  # grace period for startup
+                self._selector.register(channel, selectors.EVENT_READ, pid)
+            logger.debug(f'worker {worker_id} started (pid={pid})')
+            return
+
+        # child process
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        # Drop the supervisor's fds (the selector of the parent is not affected).
+        self._selector.close()
+        for sock in (*self._wakeup, *self._channels.values()):
+            sock.close()
+        if pair is not None:
+            pair[0].close()
+            self.channel = pair[1]
+
+        exitcode = 0
+        try:
+            self.target(worker_id)
+        except Exception:
+            logger.exception(f'worker {worker_id} crashed')
+            exitcode = 1
+        finally:
+            # Never return into the caller's stack of the parent process.
+            os._exit(exitcode)
+
+    def _handle_stop(self, signum: int, _frame: FrameType | None) -> None:
+        logger.debug(f'supervisor recv {signal.Signals(signum).name}, stopping workers')
+        self._stopping = True
+        for pid in self._children:
+            with suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    def _close_channel(self, pid: int) -> None:
+        self._last_seen.pop(pid, None)
+        if pid in self._channels:
+            channel = self._channels.pop(pid)
+            self._selector.unregister(channel)
+            channel.close()
+
+    def _handle_pong(self, pid: int) -> None:
+        channel = self._channels[pid]
+        try:
+            data = channel.recv(64)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            # The worker exited (reaped by `_reap()`).
+            self._close_channel(pid)
+        elif pid in self._last_seen:
+            self._last_seen[pid] = time.monotonic()
+
+    def _check_health(self, now: float) -> None:
+        assert self.health_timeout is not None
+        for pid, last_seen in list(self._last_seen.items()):
+            if now - last_seen > self.health_timeout:
+                logger.warning(f'worker {self._children[pid]} (pid={pid}) unresponsive, kill')
+                del self._last_seen[pid]
+                with suppress(ProcessLookupError):
+                    os.kill(pid, signal.SIGKILL)
+            else:
+                with suppress(OSError):
+                    self._channels[pid].send(b'\0')
+
+    def _reap(self) -> None:
+        """Collect exited workers, restart crashed ones."""
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self._children.clear()
+                return
+            if not pid:
+                return
+
+            if pid not in self._children:
+                continue
+            worker_id = self._children.pop(pid)
+            self._close_channel(pid)
+            exitcode = os.waitstatus_to_exitcode(status)
+            logger.debug(f'worker {worker_id} (pid={pid}) exited: {exitcode}')
+
+            if self._stopping or (exitcode == 0 and self.restart != 'always'):
+                continue
+
+            if exitcode:
+                # Throttled: restarted by the main loop, which keeps supervising meanwhile.
+                logger.warning(f'worker {worker_id} (pid={pid}) crashed, restarting')
+                self._restart_at[worker_id] = time.monotonic() + self.restart_delay
+            else:
+                self._spawn(worker_id)
+
+    def _restart_due(self, now: float) -> None:
+        """Restart the crashed workers whose `restart_delay` has elapsed."""
+        if self._stopping:
+            self._restart_at.clear()
+            return
+        for worker_id, restart_at in list(self._restart_at.items()):
+            if restart_at <= now:
+                del self._restart_at[worker_id]
+                self._spawn(worker_id)
+
+    def run(self) -> None:
+        """Start all workers and supervise them until they all exit."""
+        # Self-pipe: signals (`SIGCHLD`, `SIGTERM`) wake up `select()` at once.
+        wakeup_recv, wakeup_send = self._wakeup
+        wakeup_recv.setblocking(False)
+        wakeup_send.setblocking(False)
+        self._selector.register(wakeup_recv, selectors.EVENT_READ)
+        old_wakeup_fd = signal.set_wakeup_fd(wakeup_send.fileno())
+
+        signal.signal(signal.SIGCHLD, lambda _signum, _frame: None)
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        try:
+            for worker_id in range(self.workers):
+                self._spawn(worker_id)
+
+            next_ping = time.monotonic()
+            while self._children or (self._restart_at and not self._stopping):
+                deadlines = list(self._restart_at.values())
+                if self.health_interval is not None:
+                    deadlines.append(next_ping)
+                timeout = None
+                if deadlines:
+                    timeout = max(0.0, min(deadlines) - time.monotonic())
+
+                for key, _mask in self._selector.select(timeout):
+                    if key.fileobj is wakeup_recv:
+                        with suppress(BlockingIOError):
+                            while wakeup_recv.recv(512):
+                                pass
+                    else:
+                        self._handle_pong(key.data)
+
+                self._reap()
+
+                now = time.monotonic()
+                self._restart_due(now)
+                if self.health_interval is not None and now >= next_ping:
+                    self._check_health(now)
+                    next_ping = now + self.health_interval
+        finally:
+            signal.set_wakeup_fd(old_wakeup_fd)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            for pid in list(self._channels):
+                self._close_channel(pid)
+            self._selector.close()
+            wakeup_recv.close()
+            wakeup_send.close()
+
+        logger.debug('all workers exited')
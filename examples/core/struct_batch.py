@@ -0,0 +1,294 @@
+"""Batch Struct Codec - Columnar Decode/Encode of Fixed-Size Records
+
+Unpacking one record at a time (`Struct.unpack_from()` in a Python loop) costs one call
+and one tuple (plus one object per field) per record. A buffer of N concatenated records
+is decoded by columns instead, each one in a few C-level passes:
+
+- gather: the bytes of a field, at `offset` every `record size` bytes, are collected by
+  extended slice assignment (`column[k::width] = data[offset + k::size]`, one pass per
+  byte of the field);
+- convert: numeric fields become `array.array` (compact, no object per value, byte order
+  fixed by `byteswap()`); other fields (`s`, `c`, `?`, `e`) go through `struct.iter_unpack()`
+  on the gathered column;
+- `numpy.frombuffer()` (optional) with a structured `dtype` maps the buffer as is:
+  no copy at all; each field is a (strided) array view.
+
+Encoding is the inverse (scatter each column into the records).
+
+Benchmark (records/sec):
+
+    python -m examples.core.struct_batch
+"""
+
+from __future__ import annotations
+
+import array
+import re
+import struct
+import sys
+import time
+from collections.abc import Callable, Mapping, Sequence
+from typing import TYPE_CHECKING
+
+from examples.core.struct_schema import TELEMETRY
+
+if TYPE_CHECKING:
+    import numpy as np
+
+type Buffer = bytes | bytearray | memoryview
+type Columns = dict[str, Sequence[object]]
+
+# struct format code -> numpy dtype kind (standard sizes only)
+_NUMPY_CODES = {
+    'c': 'S1',
+    'b': 'i1',
+    'B': 'u1',
+    '?': 'b1',
+    'h': 'i2',
+    'H': 'u2',
+    'i': 'i4',
+    'I': 'u4',
+    'l': 'i4',
+    'L': 'u4',
+    'q': 'i8',
+    'Q': 'u8',
+    'e': 'f2',
+    'f': 'f4',
+    'd': 'f8',
+}
+_NUMPY_BYTE_ORDERS = {'!': '>', '>': '>', '<': '<', '=': '='}
+_FORMAT_ITEM = re.compile(r'\s*(\d*)([xcbB?hHiIlLqQefds])')
+
+
+def _array_code(code: str) -> str | None:
+    """`array` type code of the same (standard) size as the struct `code`, if any."""
+    if code not in 'bBhHiIlLqQfd':
+        return None
+    size = struct.calcsize(f'={code}')
+    candidates = 'fd' if code in 'fd' else 'bhilq' if code.islower() else 'BHILQ'
+    return next((t for t in candidates if array.array(t).itemsize == size), None)
+
+
+class _Field:
+    __slots__ = ('array_code', 'code', 'offset', 'struct', 'width')
+
+    def __init__(self, code: str, width: int, offset: int, byte_order: str) -> None:
+        self.code = code
+        self.width = width
+        self.offset = offset
+        self.array_code = _array_code(code)
+        self.struct = struct.Struct(f'{byte_order}{width}s' if code == 's' else byte_order + code)
+
+
+class BatchCodec:
+    """Decode/encode buffers of concatenated fixed-size records, by columns.
+
+    `names` name the unpacked items in order (e.g. 2 names for `'2h'`, 1 for `'2s'`).
+    Standard sizes only (byte order `!`, `>`, `<` or `=`): no native alignment.
+    """
+
+    def __init__(self, fmt: str, names: Sequence[str]) -> None:
+        byte_order, body = fmt.lstrip()[:1], fmt.lstrip()[1:]
+        if byte_order not in _NUMPY_BYTE_ORDERS:
+            raise ValueError(f'byte order required (one of !><=): {fmt!r}')
+
+        fields: list[_Field] = []
+        pos = offset = 0
+        for match in _FORMAT_ITEM.finditer(body):
+            if match.start() != pos:
+                break
+            pos = match.end()
+            count, code = int(match[1] or 1), match[2]
+            if code == 's':
+                fields.append(_Field(code, count, offset, byte_order))
+                offset += count
+            elif code == 'x':
+                offset += count
+            else:
+                width = struct.calcsize(f'={code}')
+                for _ in range(count):
+                    fields.append(_Field(code, width, offset, byte_order))
+                    offset += width
+        if body[pos:].strip():
+            raise ValueError(f'unsupported format: {fmt!r}')
+        if len(fields) != len(names):
+            raise ValueError(f'{len(names)} names for {len(fields)} items: {fmt!r}')
+
+        self.struct = struct.Struct(fmt)
+        self.names = tuple(names)
+        self.size = self.struct.size
+        self._fields = fields
+        self._byte_order = _NUMPY_BYTE_ORDERS[byte_order]
+        self._byteswap = self._byte_order != '=' and self._byte_order != (
+            '<' if sys.byteorder == 'little' else '>'
+        )
+        self._dtype: np.dtype | None = None
+
+    def count(self, data: Buffer) -> int:
+        """Number of records in `data`.
+
+        :raise `ValueError`: not a whole number of records.
+        """
+        count, rest = divmod(len(data), self.size)
+        if rest:
+            raise ValueError(f'{len(data)} bytes is not a multiple of {self.size}')
+        return count
+
+    def decode(self, data: Buffer) -> Columns:
+        """Decode all the records of `data` into one column per field.
+
+        Numeric columns are `array.array`, the others lists.
+        """
+        count = self.count(data)
+        view = memoryview(data).cast('B')
+        columns: Columns = {}
+        for name, field in zip(self.names, self._fields, strict=True):
+            width = field.width
+            column = bytearray(width * count)
+            for k in range(width):
+                column[k::width] = view[field.offset + k :: self.size]
+            if field.array_code is not None:
+                values = array.array(field.array_code, column)
+                if self._byteswap:
+                    values.byteswap()
+                columns[name] = values
+            else:
+                columns[name] = [value for (value,) in field.struct.iter_unpack(column)]
+        return columns
+
+    def encode(self, columns: Mapping[str, Sequence[object]]) -> bytes:
+        """Encode columns (of the same length) into concatenated records."""
+        count = len(columns[self.names[0]])
+        data = bytearray(self.size * count)  # pad bytes are zeros
+        for name, field in zip(self.names, self._fields, strict=True):
+            values = columns[name]
+            if len(values) != count:
+                raise ValueError(f'column {name!r}: {len(values)} values, {count} expected')
+            if field.array_code is not None:
+                numbers = array.array(field.array_code, values)  # type: ignore[type-var]
+                if self._byteswap:
+                    numbers.byteswap()
+                column = numbers.tobytes()
+            else:
+                column = b''.join(map(field.struct.pack, values))
+            width = field.width
+            for k in range(width):
+                data[field.offset + k :: self.size] = column[k::width]
+        return bytes(data)
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Structured `numpy` dtype of a record (same layout, no padding)."""
+        if self._dtype is None:
+            import numpy as np
+
+            self._dtype = np.dtype(
+                {
+                    'names': list(self.names),
+                    'formats': [
+                        f'S{field.width}'
+                        if field.code == 's'
+                        else self._byte_order + _NUMPY_CODES[field.code]
+                        for field in self._fields
+                    ],
+                    'offsets': [field.offset for field in self._fields],
+                    'itemsize': self.size,
+                }
+            )
+        return self._dtype
+
+    def decode_numpy(self, data: Buffer) -> np.ndarray:
+        """Map the records of `data` as a structured array (zero-copy, requires `numpy`).
+
+        The array shares the memory of `data` (read-only if `data` is `bytes`):
+        `array['field']` is a column.
+        """
+        import numpy as np
+
+        return np.frombuffer(data, dtype=self.dtype, count=self.count(data))
+
+    def encode_numpy(self, columns: Mapping[str, object]) -> bytes:
+        """Encode columns (sequences or arrays, of the same length) (requires `numpy`)."""
+        import numpy as np
+
+        length = len(columns[self.names[0]])  # type: ignore[arg-type]
+        records = np.zeros(length, dtype=self.dtype)  # zero padding, as `struct`
+        for name in self.names:
+            records[name] = columns[name]
+        return records.tobytes()
+
+
+def _check_numpy(codec: BatchCodec, data: Buffer) -> None:
+    """The `numpy` path decodes/encodes `data` as the pure-Python path.
+
+    (`numpy` strips trailing NUL bytes of `S` fields: none in `data`.)
+    """
+    columns = codec.decode(data)
+    records = codec.decode_numpy(data)
+    for name in codec.names:
+        assert records[name].tolist() == list(columns[name]), name
+    assert codec.encode_numpy(records) == bytes(data)
+    assert codec.encode_numpy(columns) == codec.encode(columns)
+
+
+# Benchmark
+
+
+def benchmark(count: int = 1_000_000) -> None:
+    """Decode/encode `count` `TELEMETRY` records: per record vs. by columns."""
+    codec = BatchCodec(TELEMETRY.format, TELEMETRY.names)
+    columns: Columns = {
+        'id': range(count),
+        'tag': [b'ab'] * count,
+        'timestamp': range(count),
+        'x': [3] * count,
+        'y': [-3] * count,
+        'value': [2.5] * count,
+    }
+    data = codec.encode(columns)
+
+    def decode_per_record() -> object:
+        unpack_from, size = codec.struct.unpack_from, codec.size
+        return [unpack_from(data, offset) for offset in range(0, len(data), size)]
+
+    def encode_per_record() -> object:
+        return b''.join(
+            codec.struct.pack(*record) for record in zip(*columns.values(), strict=True)
+        )
+
+    cases: list[tuple[str, Callable[[], object]]] = [
+        ('decode: per record', decode_per_record),
+        ('decode: columns', lambda: codec.decode(data)),
+        ('encode: per record', encode_per_record),
+        ('encode: columns', lambda: codec.encode(columns)),
+    ]
+    try:
+        import numpy  # noqa: F401
+
+        _check_numpy(codec, data[: 1000 * codec.size])
+        mixed = BatchCodec('< c ? x e H 3s q d', ('c', 'flag', 'half', 'u', 's', 'q', 'd'))
+        _check_numpy(
+            mixed,
+            b''.join(
+                mixed.struct.pack(bytes([65 + i % 26]), i % 2 == 0, i / 4, i, b'abc', -i, i / 3)
+                for i in range(100)
+            ),
+        )
+
+        records = codec.decode_numpy(data)
+        cases += [
+            ('decode: numpy.frombuffer()', lambda: codec.decode_numpy(data)),
+            ('encode: numpy', lambda: codec.encode_numpy(records)),
+        ]
+    except ImportError:
+        print('numpy not installed, skip numpy')
+
+    for name, run in cases:
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        print(f'{name:>26}: {count / elapsed:12.0f} records/sec')
+
+
+if __name__ == '__main__':
+    benchmark()
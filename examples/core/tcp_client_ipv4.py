@@ -6,6 +6,8 @@ import struct
 import sys
 import time
 
+from examples.core.framing import recv_frame, send_frame
+
 logging.basicConfig(level=logging.DEBUG, style='{', format='[{processName} ({process})] {message}')
 
 
@@ -70,11 +72,12 @@ def run_tcp_client(
             if read_sleep is not None:
                 time.sleep(read_sleep)
 
-            client.sendall(data)
+            # length-prefixed frame
+            send_frame(client, data)
             logging.debug(f'sent: {data!r}')
 
-            data = client.recv(1024)
-            logging.debug(f'recv: {data!r}')
+            response = recv_frame(client)
+            logging.debug(f'recv: {response!r}')
 
     except OSError as err:
         logging.error(err)
@@ -1,14 +1,31 @@
 """TCP Server (IPv4) - Standard Framework"""
 
+import functools
 import logging
+import os
+import signal
 import socket
 import socketserver
-import struct
 import sys
 import threading
+from abc import ABC, abstractmethod
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
+
+from examples.core.buffer_pool import BufferPool
+from examples.core.framing import (
+    BUFFER_SIZE,
+    MAX_FRAME_SIZE,
+    FrameReader,
+    RecordReader,
+    pack_frame,
+    recv_frame,
+    send_frame,
+)
+from examples.core.prefork import Prefork
+from examples.core.struct_schema import TELEMETRY, Message, registry
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -17,8 +34,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger()
 
+type ServerMode = Literal['sync', 'threading', 'pool']
+type OverflowPolicy = Literal['reject', 'caller_runs']
+
+# `recv_into()` buffers of persistent connections
+frame_buffer_pool = BufferPool(BUFFER_SIZE, count=8)
 
-class ByteHandler(socketserver.BaseRequestHandler):
+
+class FramedHandler(socketserver.BaseRequestHandler, ABC):
+    """
+    The request handler class for length-prefixed frames.
+
+    It serves many messages over one persistent connection (until the client closes it),
+    and must override the handle_frame() method to reply each message.
+
+    Short reads are reassembled into a preallocated buffer with `recv_into()`, and
+    replies to all frames received by one `recv_into()` are sent back in one `sendall()`
+    (pipelining).
+    """
+
+    max_frame_size: int = MAX_FRAME_SIZE
+
+    def handle(self) -> None:
+        assert isinstance(self.request, socket.socket)
+
+        buffer = frame_buffer_pool.acquire()
+        try:
+            reader = FrameReader(self.request, max_frame_size=self.max_frame_size, buffer=buffer)
+            while (frames := reader.recv_frames()) is not None:
+                if frames:
+                    replies = [pack_frame(self.handle_frame(frame)) for frame in frames]
+                    self.request.sendall(b''.join(replies))
+        except ValueError as err:
+            logger.error(f'[{self.client_address}] {err}')
+        finally:
+            frame_buffer_pool.release(buffer)
+        logger.debug(f'[{self.client_address}] disconnected')
+
+    @abstractmethod
+    def handle_frame(self, payload: memoryview) -> bytes:
+        """Return the reply for one frame.
+
+        `payload` is only valid during this call.
+        """
+
+
+class ByteHandler(FramedHandler):
     """
     The request handler class for our server.
 
@@ -65,16 +126,18 @@ class ByteHandler(socketserver.BaseRequestHandler):
 
         # Fast Open
         if sys.platform == 'linux':
-            fastopen = self.request.getsockopt(socket.SOL_SOCKET, socket.TCP_FASTOPEN)
+            fastopen = self.request.getsockopt(socket.IPPROTO_TCP, socket.TCP_FASTOPEN)
             logger.debug(f'[{self.client_address}] Fast Open: {fastopen}')
 
-        data: bytes = self.request.recv(1024)
-        logger.debug(f'[{self.client_address}] recv: {data!r}')
+        super().handle()
+
+    def handle_frame(self, payload: memoryview) -> bytes:
+        logger.debug(f'[{self.client_address}] recv: {payload.tobytes()!r}')
 
         # just send back the same data, but upper-cased
-        data = data.upper()
-        self.request.sendall(data)
+        data = payload.tobytes().upper()
         logger.debug(f'[{self.client_address}] sent: {data!r}')
+        return data
 
 
 class LineHandler(socketserver.StreamRequestHandler):
@@ -93,7 +156,7 @@ class LineHandler(socketserver.StreamRequestHandler):
         logger.debug(f'[{self.client_address}] sent: {data!r}')
 
 
-class BinHandler(socketserver.BaseRequestHandler):
+class BinHandler(FramedHandler):
     """
     The request handler class for binary data.
 
@@ -102,10 +165,6 @@ class BinHandler(socketserver.BaseRequestHandler):
     client.
     """
 
-    def setup(self) -> None:
-        self.unpacker = struct.Struct('! I 2s Q 2h f')
-        return super().setup()
-
     def handle(self) -> None:
         logger.debug(f'connected from {self.client_address}')
 
@@ -120,16 +179,146 @@ class BinHandler(socketserver.BaseRequestHandler):
         timeout = self.request.gettimeout()
         logger.debug(f'[{self.client_address}] recv/send timeout: {timeout} seconds')
 
-        data: bytes = self.request.recv(self.unpacker.size)
-        logger.debug(f'[{self.client_address}] recv: {data!r}')
+        super().handle()
 
-        unpacked_data: tuple[Any, ...] = self.unpacker.unpack(data)
-        logger.debug(f'[{self.client_address}] recv unpacked: {unpacked_data}')
+    def handle_frame(self, payload: memoryview) -> bytes:
+        logger.debug(f'[{self.client_address}] recv: {payload.tobytes()!r}')
 
-        # just send back the same data, but upper-cased
-        data = data.upper()
-        self.request.sendall(data)
+        # dispatched by the type tag, as over UDP (see `examples.core.struct_schema`)
+        # unknown type or size mismatch: `ValueError`, logged, connection closed
+        message = registry.decode(payload)
+        logger.debug(f'[{self.client_address}] recv unpacked: {message}')
+
+        # just send back the same message
+        data = registry.encode(message)
         logger.debug(f'[{self.client_address}] sent: {data!r}')
+        return data
+
+
+class BinStreamHandler(socketserver.BaseRequestHandler):
+    """
+    The request handler class for a stream of fixed-size binary records
+    (e.g. telemetry ingest), without framing nor replies.
+
+    It serves one persistent connection (until the client closes it), and must
+    override the handle_records() method to process each batch of records.
+    """
+
+    record = TELEMETRY.struct
+
+    def handle(self) -> None:
+        logger.debug(f'connected from {self.client_address}')
+
+        assert isinstance(self.request, socket.socket)
+
+        count = 0
+        buffer = frame_buffer_pool.acquire()
+        try:
+            for records in RecordReader(self.request, self.record, buffer=buffer):
+                self.handle_records(records)
+                count += len(records)
+        finally:
+            frame_buffer_pool.release(buffer)
+        logger.debug(f'[{self.client_address}] disconnected, {count} records received')
+
+    def handle_records(self, records: list[tuple[Any, ...]]) -> None:
+        """Process one batch of records (all received by one `recv_into()`)."""
+        logger.debug(f'[{self.client_address}] recv {len(records)} records: {records[0]}, ...')
+
+
+class ThreadPoolTCPServer(socketserver.TCPServer):
+    """TCP server handling requests on a fixed-size thread pool.
+
+    Unlike `socketserver.ThreadingTCPServer` (one new thread per connection), at most
+    `max_workers` requests are handled concurrently, and at most `max_queued` accepted
+    requests wait for a free worker. On overflow:
+
+    - `'reject'`: close the new connection immediately.
+    - `'caller_runs'`: handle it in the server thread, which stops accepting meanwhile
+      (backpressure to the kernel accept queue).
+    """
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        RequestHandlerClass: Callable[[Any, Any, Any], socketserver.BaseRequestHandler],
+        bind_and_activate: bool = True,
+        *,
+        max_workers: int | None = None,
+        max_queued: int = 1024,
+        overflow_policy: OverflowPolicy = 'reject',
+    ) -> None:
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+        if max_workers is None:
+            # same default as `ThreadPoolExecutor`
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='tcp-worker')
+        self.overflow_policy = overflow_policy
+        self._slots = threading.BoundedSemaphore(max_workers + max_queued)
+
+        # counters
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.processed = 0  # in the pool, or run by the server thread (`'caller_runs'`)
+        self.rejected = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                'queued': self.queued,
+                'active': self.active,
+                'processed': self.processed,
+                'rejected': self.rejected,
+            }
+
+    def process_request(
+        self, request: socket.socket | tuple[bytes, socket.socket], client_address: tuple[str, int]
+    ) -> None:
+        if not self._slots.acquire(blocking=False):
+            if self.overflow_policy == 'caller_runs':
+                self._run_request(request, client_address)
+                return
+            with self._lock:
+                self.rejected += 1
+            logger.warning(f'[{client_address}] rejected: thread pool overflow')
+            self.shutdown_request(request)
+            return
+
+        with self._lock:
+            self.queued += 1
+        self.executor.submit(self._process_request_in_pool, request, client_address)
+
+    def _process_request_in_pool(
+        self, request: socket.socket | tuple[bytes, socket.socket], client_address: tuple[str, int]
+    ) -> None:
+        with self._lock:
+            self.queued -= 1
+        try:
+            self._run_request(request, client_address)
+        finally:
+            self._slots.release()  # only pooled requests hold a slot
+
+    def _run_request(
+        self, request: socket.socket | tuple[bytes, socket.socket], client_address: tuple[str, int]
+    ) -> None:
+        """Handle one request in the current thread, counted as `active`."""
+        with self._lock:
+            self.active += 1
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._lock:
+                self.active -= 1
+                self.processed += 1
+
+    def server_close(self) -> None:
+        super().server_close()
+        # wait for queued and active requests
+        self.executor.shutdown(wait=True)
 
 
 # pylint: disable=no-member
@@ -142,12 +331,27 @@ def client(
         sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
         sock.connect(addr)
-        sock.sendall(message)
-        response: bytes = sock.recv(1024)
+        send_frame(sock, message)
+        response = recv_frame(sock)
         logging.debug(f'recv: {response!r}')
 
 
-def run_tcp_server(
+def bin_client(
+    addr: tuple[str | bytes | bytearray, int] | tuple[str | bytes | bytearray, int, int, int],
+    message: Message,
+) -> Message:
+    """Send one tagged message (of a type of `registry`) to `BinHandler`."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        sock.connect(addr)
+        send_frame(sock, registry.encode(message))
+        response = registry.decode(recv_frame(sock))
+        logging.debug(f'recv unpacked: {response}')
+        return response
+
+
+def create_tcp_server(
     request_hander: Callable[
         [Any, Any, socketserver.TCPServer | socketserver.ThreadingTCPServer],
         socketserver.BaseRequestHandler,
@@ -166,102 +370,224 @@ def run_tcp_server(
     allow_quickack: bool = True,
     allow_fastopen: bool | None = None,
     enable_threading: bool = False,
-) -> None:
-    """Run TCP server.
+    server_mode: ServerMode | None = None,
+    max_workers: int | None = None,
+    max_queued: int = 1024,
+    overflow_policy: OverflowPolicy = 'reject',
+) -> socketserver.TCPServer:
+    """Create TCP server, bound and listening.
 
     :param `host`:
         - `''` or `'0.0.0.0'`: `socket.INADDR_ANY`
         - `'localhost'`: `socket.INADDR_LOOPBACK`
         - `socket.INADDR_BROADCAST`
+    :param `server_mode`:
+        - `'sync'`: `socketserver.TCPServer`, one request at a time
+        - `'threading'`: `socketserver.ThreadingTCPServer`, one new thread per request
+        - `'pool'`: `ThreadPoolTCPServer`, bounded by `max_workers` and `max_queued`
+        Default to `'threading'` if `enable_threading`, otherwise `'sync'`.
     """
-    server_class = socketserver.ThreadingTCPServer if enable_threading else socketserver.TCPServer
-
-    with server_class((host, port), request_hander, bind_and_activate=False) as server:
-        # Reuse Address: `SO_REUSEADDR`
-        # server.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server.allow_reuse_address = allow_reuse_address
-
-        # Reuse Port: `SO_REUSEPORT`
-        server_class.allow_reuse_port = allow_reuse_port
-
-        server.request_queue_size = accept_queue_size  # param `backlog` for `listen()`
-
-        # Keep-Alive
-        server.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
-        if sys.platform == 'linux':  # Linux 2.4+
-            server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, keep_alive_idle)
-        elif sys.platform == 'darwin' and sys.version_info >= (3, 10):
-            server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, keep_alive_idle)
-        server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, keep_alive_cnt)
-        server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, keep_alive_intvl)
-
-        # NO_DELAY (disable Nagle's Algorithm)
-        if allow_nodelay:
-            server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-
-        # Quick ACK mode (disable delayed ACKs)
-        if allow_quickack and hasattr(socket, 'TCP_QUICKACK'):  # Linux 2.4.4+
-            assert sys.platform == 'linux'
-            server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
-
-        # Fast Open, Linux 3.7+
-        if sys.platform == 'linux':
-            if allow_fastopen is not None:
-                val = 2 if allow_fastopen else 0
-                server.socket.setsockopt(socket.SOL_SOCKET, socket.TCP_FASTOPEN, val)
-
-        server.server_bind()
-
-        reuse_address = bool(server.socket.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR))
-        logger.debug(f'Reuse Address: {reuse_address}')
+    if server_mode is None:
+        server_mode = 'threading' if enable_threading else 'sync'
+
+    server: socketserver.TCPServer
+    if server_mode == 'pool':
+        server = ThreadPoolTCPServer(
+            (host, port),
+            request_hander,
+            bind_and_activate=False,
+            max_workers=max_workers,
+            max_queued=max_queued,
+            overflow_policy=overflow_policy,
+        )
+    elif server_mode == 'threading':
+        server = socketserver.ThreadingTCPServer(
+            (host, port), request_hander, bind_and_activate=False
+        )
+    else:
+        server = socketserver.TCPServer((host, port), request_hander, bind_and_activate=False)
+
+    # Reuse Address: `SO_REUSEADDR`
+    # server.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.allow_reuse_address = allow_reuse_address
+
+    # Reuse Port: `SO_REUSEPORT`
+    server.allow_reuse_port = allow_reuse_port
+
+    server.request_queue_size = accept_queue_size  # param `backlog` for `listen()`
+
+    # Keep-Alive
+    server.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    if sys.platform == 'linux':  # Linux 2.4+
+        server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, keep_alive_idle)
+    elif sys.platform == 'darwin' and sys.version_info >= (3, 10):
+        server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, keep_alive_idle)
+    server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, keep_alive_cnt)
+    server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, keep_alive_intvl)
+
+    # NO_DELAY (disable Nagle's Algorithm)
+    if allow_nodelay:
+        server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    # Quick ACK mode (disable delayed ACKs)
+    if allow_quickack and hasattr(socket, 'TCP_QUICKACK'):  # Linux 2.4.4+
+        assert sys.platform == 'linux'
+        server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
+    # Fast Open, Linux 3.7+
+    if sys.platform == 'linux':
+        if allow_fastopen is not None:
+            val = 2 if allow_fastopen else 0
+            server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_FASTOPEN, val)
+
+    server.server_bind()
+
+    reuse_address = bool(server.socket.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR))
+    logger.debug(f'Reuse Address: {reuse_address}')
+
+    reuse_port = bool(server.socket.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT))
+    logger.debug(f'Reuse Port: {reuse_port}')
+
+    nodelay = bool(server.socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
+    logger.debug(f"No Delay (disable Nagle's Algorithm): {nodelay}")
+
+    # Quick ACK (disable delayed ACKs)
+    if hasattr(socket, 'TCP_QUICKACK'):  # Linux 2.4.4+
+        assert sys.platform == 'linux'
+        quickack = bool(server.socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK))
+        logger.debug(f'Quick ACK: {quickack}')
+
+    if sys.platform == 'linux':  # Linux 3.7+
+        fastopen = server.socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_FASTOPEN)
+        logger.debug(f'Fast Open: {fastopen}')
+
+    # On Linux 2.2+, there are two queues: SYN queue and accept queue
+    #       syn queue size: /proc/sys/net/ipv4/tcp_max_syn_backlog
+    #       accept queue size: /proc/sys/net/core/somaxconn
+    if sys.platform == 'linux':
+        assert (
+            int(Path('/proc/sys/net/core/somaxconn').read_text('utf-8').strip()) == socket.SOMAXCONN
+        )
+    # syn_queue_size = int(
+    #    Path('/proc/sys/net/ipv4/tcp_max_syn_backlog').read_text('utf-8').strip()
+    # )
+    #
+    # Set backlog (accept queue size) for `listen()`.
+    # kernel do this already!
+    # accept_queue_size: int = min(accept_queue_size, socket.SOMAXCONN)
+    #
+    # server.socket.listen(server.request_queue_size)
+    server.server_activate()
+
+    # - blocking (default): `socket.settimeout(None)` or `socket.setblocking(True)`
+    # - timeout: `socket.settimeout(3.5)`
+    # - non-blocking: `socket.settimeout(0.0)` or `socket.setblocking(False)`
+    #
+    # for `accept()`, `send()`, `sendall()`, `recv()`
+    server.socket.settimeout(timeout)
+
+    assert server.server_address == server.socket.getsockname()
+
+    return server
+
+
+def serve_until_terminated(server: socketserver.TCPServer, poll_interval: float = 0.5) -> None:
+    """Serve until `SIGTERM`, then drain gracefully.
+
+    `shutdown()` stops accepting new connections and waits for the request being handled
+    (`TCPServer`), and `server_close()` joins all request threads (`ThreadingTCPServer`,
+    `block_on_close` is `True` by default).
+    """
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda _signum, _frame: stop.set())
 
-        reuse_port = bool(server.socket.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT))
-        logger.debug(f'Reuse Port: {reuse_port}')
+    server_thread = threading.Thread(
+        target=server.serve_forever, kwargs={'poll_interval': poll_interval}
+    )
+    server_thread.start()
+    logger.debug(f'running on {server.server_address}')
 
-        nodelay = bool(server.socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY))
-        logger.debug(f"No Delay (disable Nagle's Algorithm): {nodelay}")
+    stop.wait()
+    logger.debug('draining ...')
+    server.shutdown()
+    server.server_close()
+    server_thread.join()
+    logger.debug('drained')
 
-        # Quick ACK (disable delayed ACKs)
-        if hasattr(socket, 'TCP_QUICKACK'):  # Linux 2.4.4+
-            assert sys.platform == 'linux'
-            quickack = bool(server.socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK))
-            logger.debug(f'Quick ACK: {quickack}')
 
-        if sys.platform == 'linux':  # Linux 3.7+
-            fastopen = server.socket.getsockopt(socket.SOL_SOCKET, socket.TCP_FASTOPEN)
-            logger.debug(f'Fast Open: {fastopen}')
+def run_tcp_server(
+    request_hander: Callable[
+        [Any, Any, socketserver.TCPServer | socketserver.ThreadingTCPServer],
+        socketserver.BaseRequestHandler,
+    ],
+    *,
+    keep_alive_idle: int,
+    keep_alive_cnt: int,
+    keep_alive_intvl: int,
+    host: str = '',
+    port: int = 0,  # Port 0 means to select an arbitrary unused port
+    accept_queue_size: int = socket.SOMAXCONN,
+    timeout: float | None = None,  # in seconds, `None` for blocking
+    allow_reuse_address: bool = True,
+    allow_reuse_port: bool = True,
+    allow_nodelay: bool = True,
+    allow_quickack: bool = True,
+    allow_fastopen: bool | None = None,
+    enable_threading: bool = False,
+    server_mode: ServerMode | None = None,
+    max_workers: int | None = None,
+    max_queued: int = 1024,
+    overflow_policy: OverflowPolicy = 'reject',
+    workers: int = 1,
+) -> None:
+    """Run TCP server.
 
-        # On Linux 2.2+, there are two queues: SYN queue and accept queue
-        #       syn queue size: /proc/sys/net/ipv4/tcp_max_syn_backlog
-        #       accept queue size: /proc/sys/net/core/somaxconn
-        if sys.platform == 'linux':
-            assert (
-                int(Path('/proc/sys/net/core/somaxconn').read_text('utf-8').strip())
-                == socket.SOMAXCONN
-            )
-        # syn_queue_size = int(
-        #    Path('/proc/sys/net/ipv4/tcp_max_syn_backlog').read_text('utf-8').strip()
-        # )
-        #
-        # Set backlog (accept queue size) for `listen()`.
-        # kernel do this already!
-        # accept_queue_size: int = min(accept_queue_size, socket.SOMAXCONN)
-        #
-        # server.socket.listen(server.request_queue_size)
-        server.server_activate()
+    :param `host`:
+        - `''` or `'0.0.0.0'`: `socket.INADDR_ANY`
+        - `'localhost'`: `socket.INADDR_LOOPBACK`
+        - `socket.INADDR_BROADCAST`
+    :param `server_mode`: see `create_tcp_server()`.
+    :param `workers`: number of prefork worker processes.
+        Each worker binds its own listener with `SO_REUSEPORT` on the same port,
+        and the kernel load-balances incoming connections across them.
+    """
+    if server_mode is None:
+        server_mode = 'threading' if enable_threading else 'sync'
+
+    server_factory = functools.partial(
+        create_tcp_server,
+        request_hander,
+        keep_alive_idle=keep_alive_idle,
+        keep_alive_cnt=keep_alive_cnt,
+        keep_alive_intvl=keep_alive_intvl,
+        host=host,
+        port=port,
+        accept_queue_size=accept_queue_size,
+        timeout=timeout,
+        allow_reuse_address=allow_reuse_address,
+        allow_reuse_port=allow_reuse_port,
+        allow_nodelay=allow_nodelay,
+        allow_quickack=allow_quickack,
+        allow_fastopen=allow_fastopen,
+        server_mode=server_mode,
+        max_workers=max_workers,
+        max_queued=max_queued,
+        overflow_policy=overflow_policy,
+    )
 
-        # - blocking (default): `socket.settimeout(None)` or `socket.setblocking(True)`
-        # - timeout: `socket.settimeout(3.5)`
-        # - non-blocking: `socket.settimeout(0.0)` or `socket.setblocking(False)`
-        #
-        # for `accept()`, `send()`, `sendall()`, `recv()`
-        server.socket.settimeout(timeout)
+    if workers > 1:
+        if not allow_reuse_port:
+            raise ValueError('multiple workers require `allow_reuse_port`')
+        if port == 0:
+            raise ValueError('multiple workers require a fixed port')
 
-        assert server.server_address == server.socket.getsockname()
+        Prefork(lambda _worker_id: serve_until_terminated(server_factory()), workers).run()
+        return
 
-        if enable_threading:
+    with server_factory() as server:
+        if server_mode != 'sync':
             # Start a thread with the server -- that thread will then start one
-            # more thread for each request
+            # more thread (or hand over to a pool thread) for each request
             # daemon: exit the server thread when the main thread terminates
             server_thread = threading.Thread(target=server.serve_forever, daemon=True)
             server_thread.start()
@@ -271,6 +597,9 @@ def run_tcp_server(
             client(server.server_address, b'Hello World 2')
             client(server.server_address, b'Hello World 3')
 
+            if isinstance(server, ThreadPoolTCPServer):
+                logger.debug(f'thread pool: {server.stats()}')
+
             server.shutdown()
             # server.serve_forever()
         else:
@@ -297,4 +626,7 @@ if __name__ == '__main__':
         allow_quickack=True,
         allow_fastopen=None,
         enable_threading=False,
+        server_mode='sync',  # 'sync', 'threading', 'pool'
+        max_workers=None,
+        workers=1,
     )
@@ -0,0 +1,71 @@
+"""Hashed Timer Wheel - Idle Timeouts in O(1) (时间轮)
+
+Closing idle connections by scanning all of them every tick is O(N), and scheduling one
+timer per connection (`loop.call_later()`) costs a heap push (and a cancel) per activity.
+
+A timer wheel is a ring of `slots` buckets, one per `tick`. All connections share the
+same idle timeout, so a connection active now expires in the bucket just behind the
+cursor, a full turn later:
+
+- `touch()`: move the key to that bucket, O(1);
+- `advance()`: move the cursor tick by tick, and expire all keys of each bucket passed.
+
+A key touched during the current tick may have been touched at its very end, so the ring
+has one slot more than `timeout / tick`: a key expires after `timeout` rounded up to whole
+ticks, plus at most one tick, after its last `touch()` (never before `timeout`).
+"""
+
+import math
+import time
+from collections.abc import Hashable
+
+
+class TimerWheel[K: Hashable]:
+    def __init__(self, timeout: float, tick: float = 1.0) -> None:
+        self.timeout = timeout
+        self.tick = tick
+        self.size = math.ceil(timeout / tick) + 2  # see above
+        # `dict` as ordered set
+        self.slots: list[dict[K, None]] = [{} for _ in range(self.size)]
+        self.slot_of: dict[K, int] = {}
+        self.cursor = 0
+        self.last_tick = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.slot_of)
+
+    def touch(self, key: K) -> None:
+        """Add the key, or reset its timeout."""
+        slot = (self.cursor - 1) % self.size
+        old_slot = self.slot_of.get(key)
+        if old_slot == slot:
+            return
+        if old_slot is not None:
+            del self.slots[old_slot][key]
+        self.slots[slot][key] = None
+        self.slot_of[key] = slot
+
+    def remove(self, key: K) -> None:
+        slot = self.slot_of.pop(key, None)
+        if slot is not None:
+            del self.slots[slot][key]
+
+    def advance(self, now: float | None = None) -> list[K]:
+        """Move the cursor to `now`, return (and remove) expired keys."""
+        if now is None:
+            now = time.monotonic()
+        ticks = int((now - self.last_tick) / self.tick)
+        if ticks <= 0:
+            return []
+        self.last_tick += ticks * self.tick
+
+        expired: list[K] = []
+        for _ in range(min(ticks, self.size)):
+            self.cursor = (self.cursor + 1) % self.size
+            slot = self.slots[self.cursor]
+            if slot:
+                expired.extend(slot)
+                for key in slot:
+                    del self.slot_of[key]
+                slot.clear()
+        return expired
@@ -4,8 +4,8 @@ from __future__ import annotations
 
 import logging
 import socket
-import struct
-from typing import Any
+
+from examples.core.struct_schema import TELEMETRY, registry
 
 logging.basicConfig(level=logging.DEBUG, style='{', format='[{processName} ({process})] {message}')
 
@@ -15,9 +15,7 @@ timeout: float = 5.0
 recv_bufsize: int | None = None
 send_bufsize: int | None = None
 
-binary_fmt: str = '! I 2s Q 2h f'
-binary_value: tuple[Any, ...] = (1, b'ab', 2, 3, 3, 2.5)
-packer = struct.Struct(binary_fmt)
+message = TELEMETRY(id=1, tag=b'ab', timestamp=2, x=3, y=3, value=2.5)
 
 with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as client:
     client.settimeout(timeout)
@@ -32,8 +30,8 @@ with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as client:
         data, server_address = client.recvfrom(1024)
         logging.debug(f'recv: {data!r}, from: {server_address}')
 
-        # pack binary data
-        data = packer.pack(*binary_value)
+        # pack binary data, with the type tag
+        data = registry.encode(message)
         client.sendto(data, server_address)
         logging.debug(f'sent: {data!r}')
 
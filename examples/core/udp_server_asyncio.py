@@ -8,44 +8,99 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import signal
 import socket
 
-logging.basicConfig(level=logging.DEBUG, style='{', format='[{threadName} ({thread})] {message}')
+from examples.core.event_loop import run
+from examples.core.prefork import Prefork
 
-recv_bufsize: int | None = None
+logging.basicConfig(level=logging.DEBUG, style='{', format='[{processName} ({process})] {message}')
+
+# max: /proc/sys/net/core/rmem_max, /proc/sys/net/core/wmem_max
+recv_bufsize: int | None = 4 * 1024 * 1024
 send_bufsize: int | None = None
 
+STATS_INTERVAL = 10.0  # seconds
+
 
 class EchoServerProtocol(asyncio.DatagramProtocol):
+    """Long-running UDP echo service.
+
+    The socket is checked and tuned once, in `connection_made()`. The per-datagram path
+    is a counter and one `sendto()`: no `get_extra_info()`, no `getsockopt()`.
+
+    Drop counters:
+
+    - `dropped`: replies dropped while the transport buffer is over its high watermark
+      (`pause_writing()`), instead of queueing without bound;
+    - `errors`: send errors reported by the kernel (`error_received()`, e.g. ICMP port
+      unreachable, `ENOBUFS`).
+    """
+
+    def __init__(self) -> None:
+        self.received = 0
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+        self.paused = False
+
     def connection_made(  # type: ignore[override]
         self, transport: asyncio.DatagramTransport
     ) -> None:
         self.transport = transport  # pylint: disable=attribute-defined-outside-init
 
-        sock = transport.get_extra_info('socket')
+        sock: socket.socket = transport.get_extra_info('socket')
         server_address = transport.get_extra_info('sockname')
         assert sock.getsockname() == server_address
-        logging.debug(f'Server address: {server_address}')
-
-    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
-        sock = self.transport.get_extra_info('socket')
         assert sock.type is socket.SOCK_DGRAM
         assert not sock.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR)
         assert sock.gettimeout() == 0.0
-        # logging.debug(dir(sock))
-
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
-        # handle_socket_bufsize(sock, recv_bufsize, send_bufsize)
+        logging.debug(f'Server address: {server_address}')
 
-        logging.debug(f'recv: {data!r}, from: {addr}')
+        if recv_bufsize is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, recv_bufsize)
+        if send_bufsize is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, send_bufsize)
+        logging.debug(
+            f'recv buffer size: {sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)}, '
+            f'send buffer size: {sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)}'
+        )
 
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        self.received += 1
+        if self.paused:
+            self.dropped += 1
+            return
         self.transport.sendto(data, addr)
-        logging.debug(f'sent: {data!r}, to: {addr}')
-
-        self.transport.close()
-
-
-async def udp_echo_server(host: str, port: int) -> None:
+        self.sent += 1
+
+    def error_received(self, exc: Exception) -> None:
+        self.errors += 1
+        logging.debug(f'Error received: {exc!r}')
+
+    def pause_writing(self) -> None:
+        self.paused = True
+
+    def resume_writing(self) -> None:
+        self.paused = False
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'received': self.received,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'errors': self.errors,
+        }
+
+
+async def udp_echo_server(
+    host: str,
+    port: int,
+    *,
+    stats_interval: float = STATS_INTERVAL,
+    stop: asyncio.Event | None = None,
+) -> None:
+    """Serve until `stop` is set (forever if `None`), logging stats periodically."""
     loop = asyncio.get_running_loop()
 
     # The parameter `reuse_address` is no longer supported, as using `SO_REUSEADDR`
@@ -60,16 +115,50 @@ async def udp_echo_server(host: str, port: int) -> None:
     # functionality. With `reuse_port`, `SO_REUSEPORT` is used instead, which
     # specifically prevents processes with differing UIDs from assigning sockets to the
     # same socket address.
-    transport, _ = await loop.create_datagram_endpoint(
+    transport, protocol = await loop.create_datagram_endpoint(
         EchoServerProtocol,
         (host, port),
         reuse_port=True,
     )
 
+    if stop is None:
+        stop = asyncio.Event()
     try:
-        await asyncio.sleep(3600)  # Serve for 1 hour.
+        while not stop.is_set():
+            try:
+                async with asyncio.timeout(stats_interval):
+                    await stop.wait()
+            except TimeoutError:
+                pass
+            logging.debug(f'stats: {protocol.stats()}')
     finally:
         transport.close()
 
 
-asyncio.run(udp_echo_server('127.0.0.1', 8888))  # Python 3.7+
+def run_udp_echo_workers(
+    host: str,
+    port: int,
+    workers: int | None = None,
+    *,
+    stats_interval: float = STATS_INTERVAL,
+) -> None:
+    """Run `udp_echo_server()` in `workers` processes (default: CPU count, POSIX only).
+
+    Each process binds its own socket to the same port with `SO_REUSEPORT`, and the kernel
+    hashes each flow (source address and port) to one of them.
+    """
+    if not port:
+        raise ValueError('multiple workers require a fixed port')
+
+    async def serve() -> None:
+        stop = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        await udp_echo_server(host, port, stats_interval=stats_interval, stop=stop)
+
+    Prefork(lambda _worker_id: run(serve()), workers).run()
+
+
+if __name__ == '__main__':
+    # event loop: `$ASYNCIO_LOOP`, 'auto' (default), 'asyncio' or 'uvloop'
+    # `run_udp_echo_workers()` for one socket and event loop per CPU core
+    run(udp_echo_server('127.0.0.1', 8888))
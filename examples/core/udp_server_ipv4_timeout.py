@@ -4,19 +4,22 @@ from __future__ import annotations
 
 import logging
 import socket
-import struct
-from typing import Any
+
+from examples.core.struct_schema import registry
+from examples.core.udp_batch import create_batch
 
 logging.basicConfig(level=logging.DEBUG, style='{', format='[{processName} ({process})] {message}')
 logger = logging.getLogger()
 
 
-def recv_bin_data(sock: socket.socket, unpacker: struct.Struct) -> None:
-    data, client_address = sock.recvfrom(unpacker.size)
-    if data:
-        logger.debug(f'recv: {data!r}, from {client_address}')
-        unpacked_data: tuple[Any, ...] = unpacker.unpack(data)
-        logger.debug(f'recv unpacked: {unpacked_data}')
+def unpack_bin_data(payload: memoryview) -> None:
+    # dispatched by the type tag (see `examples.core.struct_schema`)
+    try:
+        message = registry.decode(payload)
+    except ValueError as err:
+        logger.debug(f'not a message: {err}')
+        return
+    logger.debug(f'recv unpacked: {message}')
 
 
 def run_server(
@@ -36,32 +39,37 @@ def run_server(
 
     # handle_socket_bufsize(sock, recv_buf_size, send_buf_size)
 
-    binary_fmt: str = '! I 2s Q 2h f'
-    unpacker = struct.Struct(binary_fmt)
+    # Drain up to `BATCH_SIZE` datagrams per wakeup into preallocated buffers (zero-copy),
+    # and echo them back in bulk (`recvmmsg()`/`sendmmsg()` on Linux).
+    batch = create_batch(sock)
 
     # Accept and handle incoming client requests
     try:
-        sock.settimeout(timeout)
-        logger.debug(f'Server recv/send timeout: {sock.gettimeout()} seconds')
+        logger.debug(f'Server recv/send timeout: {timeout} seconds')
 
         while True:
-            data, client_address = sock.recvfrom(1024)
-            if data:
-                logger.debug(f'recv: {data!r}, from: {client_address}')
-                sock.sendto(data, client_address)
-                logger.debug(f'sent: {data!r}, to: {client_address}')
-            else:
-                logger.debug(f'no data from {client_address}')
-                break
-
-            recv_bin_data(sock, unpacker)
+            count = batch.recv(timeout)
+            logger.debug(f'recv: {count} datagrams')
+
+            for i in range(count):
+                size = batch.sizes[i]
+                if not size:
+                    logger.debug(f'no data from {batch.address(i)}')
+                    batch.send(i)  # reply to the previous ones only
+                    return
+                unpack_bin_data(batch.payload(i))
+
+            batch.send()  # echo
+            logger.debug(f'sent: {count} datagrams')
     finally:
+        batch.close()
         sock.close()
 
 
-# host
-# - 'localhost': socket.INADDR_LOOPBACK
-# - '' or '0.0.0.0': socket.INADDR_ANY
-# - socket.INADDR_BROADCAST
-# Port 0 means to select an arbitrary unused port
-run_server('localhost', 9999, timeout=5.0)
+if __name__ == '__main__':
+    # host
+    # - 'localhost': socket.INADDR_LOOPBACK
+    # - '' or '0.0.0.0': socket.INADDR_ANY
+    # - socket.INADDR_BROADCAST
+    # Port 0 means to select an arbitrary unused port
+    run_server('localhost', 9999, timeout=5.0)
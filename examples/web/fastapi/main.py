@@ -49,7 +49,9 @@ async def mqtt_listen(client: aiomqtt.Client) -> None:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[State, Any]:
-    loop = asyncio.get_event_loop()
+    # The event loop is created by uvicorn: `--loop auto|asyncio|uvloop`.
+    loop = asyncio.get_running_loop()
+    LOGGER.debug(f'event loop: {type(loop).__module__}.{type(loop).__qualname__}')
 
     async with (
         aiomqtt.Client(